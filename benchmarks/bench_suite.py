@@ -0,0 +1,353 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import types
+
+# Permite rodar direto da raiz do projeto: python benchmarks/bench_suite.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Os casos de desenho usam uma tela sem janela
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+from opensimplex import OpenSimplex
+from game import clock
+from game.chunk import Chunk
+from game.map import GameMap
+from game.npc import NPCSystem
+from game.piranha import PiranhaSwarm
+from game.items import FireballAbility, Fireball
+from game.input import InputState
+
+# Suíte de benchmarks dos caminhos mais usados do jogo. Cada caso roda com seeds
+# fixos, algumas execuções de aquecimento e várias execuções medidas; o resultado
+# é gravado em JSON e comparado com um baseline pelo melhor tempo (como o timeit,
+# menos sensível a outros processos na máquina que a média ou a mediana):
+#
+#   python benchmarks/bench_suite.py --save-baseline        # grava benchmarks/baseline.json
+#   python benchmarks/bench_suite.py --output results.json  # compara com o baseline
+#
+# Sai com código 1 se algum caso ficar mais lento que o baseline além do limite
+# (--threshold), para ser usado antes de cada versão.
+
+SEED = 1234
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+CASES = []
+
+
+def case(name, ops=1):
+    # Registra um caso: a função recebe nada e retorna a função medida, que faz
+    # `ops` operações por execução (o tempo por operação também é reportado)
+    def register(setup):
+        CASES.append((name, setup, ops))
+        return setup
+    return register
+
+
+def new_map(**options):
+    # Mapa sem mundo em disco e com geração na hora, para os tempos não dependerem de threads
+    random.seed(SEED)
+    clock.reset()
+    options.setdefault('generation_workers', 0)
+    return GameMap(seed=SEED, **options)
+
+
+def water_points(game_map, count):
+    # Pontos de água perto da origem, para colocar piranhas
+    rng = random.Random(SEED)
+    points = []
+    while len(points) < count:
+        x, y = rng.uniform(-3000, 3000), rng.uniform(-3000, 3000)
+        if game_map.get_tile_at(x, y) == 'water':
+            points.append((x, y))
+    return points
+
+
+@case('chunk.generate_chunk', ops=16)
+def bench_generate_chunk():
+    noise_gen = OpenSimplex(seed=SEED)
+    coords = iter(range(10 ** 9))
+
+    def run():
+        # Chunks sempre novos (a geração não tem cache)
+        base = next(coords) * 16
+        for i in range(16):
+            Chunk(base + i, i, 64, 12, 12, noise_gen)
+    return run
+
+
+@case('map.get_tile_at[hit]', ops=10000)
+def bench_tile_hit():
+    game_map = new_map()
+    rng = random.Random(SEED)
+    points = [(rng.uniform(0, 700), rng.uniform(0, 700)) for _ in range(10000)]
+
+    def run():
+        get_tile_at = game_map.get_tile_at
+        for x, y in points:
+            get_tile_at(x, y)
+    return run
+
+
+@case('map.get_tile_at[cached]', ops=10000)
+def bench_tile_cached():
+    # Pontos espalhados por chunks já na memória (sem o atalho do último chunk)
+    game_map = new_map()
+    rng = random.Random(SEED)
+    points = [(rng.uniform(-1500, 1500), rng.uniform(-1500, 1500)) for _ in range(10000)]
+    for x, y in points:
+        game_map.get_tile_at(x, y)
+
+    def run():
+        get_tile_at = game_map.get_tile_at
+        for x, y in points:
+            get_tile_at(x, y)
+    return run
+
+
+@case('map.get_tile_at[miss]', ops=16)
+def bench_tile_miss():
+    # Cada consulta cai num chunk que não está na memória e precisa ser gerado
+    game_map = new_map()
+    chunk_pixels = game_map.chunk_pixel_size
+    rows = iter(range(10 ** 9))
+
+    def run():
+        y = (next(rows) + 10) * chunk_pixels
+        for i in range(16):
+            game_map.get_tile_at(i * chunk_pixels, y)
+    return run
+
+
+@case('map.update_chunks[walk]', ops=100)
+def bench_update_chunks():
+    # Caminhada em linha reta: 5 pixels por passo, gerando os chunks que entram na visão
+    game_map = new_map()
+    position = [0.0]
+
+    def run():
+        for _ in range(100):
+            position[0] += 5
+            game_map.update_chunks(position[0], 300, True)
+    return run
+
+
+@case('map.draw[offscreen]', ops=10)
+def bench_map_draw():
+    pygame.display.init()
+    pygame.display.set_mode((800, 600))
+    game_map = new_map()
+    screen = pygame.Surface((800, 600))
+    game_map.update_chunks(400, 300)
+    game_map.draw(screen, 0, 0)
+    camera = [0.0]
+
+    def run():
+        for _ in range(10):
+            camera[0] = (camera[0] + 3) % 768  # Anda dentro dos chunks já carregados
+            game_map.draw(screen, camera[0], 0)
+    return run
+
+
+def new_npcs(count, spread):
+    random.seed(SEED)
+    clock.reset()
+    rng = random.Random(SEED)
+    npcs = NPCSystem(headless=True)
+    for _ in range(count):
+        npcs.spawn(rng.uniform(-spread, spread), rng.uniform(-spread, spread))
+    return npcs
+
+
+def bench_npcs(count):
+    def setup():
+        npcs = new_npcs(count, 1000)
+
+        def run():
+            # Um passo para todos, com o jogador no centro (teste do balão de fala incluso)
+            npcs.update(clock.FRAME_MS, 0, 0)
+        return run
+    return setup
+
+
+def bench_piranhas(count):
+    def setup():
+        game_map = new_map()
+        piranhas = PiranhaSwarm(game_map, headless=True)
+        for x, y in water_points(game_map, count):
+            piranhas.spawn(x, y)
+
+        def run():
+            piranhas.update()
+        return run
+    return setup
+
+
+for count in (10, 100, 1000):
+    case(f'npc.update[{count}]', ops=count)(bench_npcs(count))
+    case(f'piranha.update[{count}]', ops=count)(bench_piranhas(count))
+case('npc.update[5000]', ops=5000)(bench_npcs(5000))
+case('piranha.update[5000]', ops=5000)(bench_piranhas(5000))
+
+
+@case('piranha.draw[1000]', ops=1000)
+def bench_piranha_draw():
+    # 1000 piranhas desenhadas numa superfície fora da tela, em direções variadas
+    pygame.display.init()
+    pygame.display.set_mode((800, 600))
+    game_map = new_map()
+    piranhas = PiranhaSwarm(game_map)
+    rng = random.Random(SEED)
+    for _ in range(1000):
+        piranhas.spawn(rng.uniform(0, 800), rng.uniform(0, 600))
+    screen = pygame.Surface((800, 600))
+
+    def run():
+        piranhas.direction[:1000] += 0.05  # Todas viram um pouco a cada desenho
+        piranhas.draw(screen, 0, 0)
+    return run
+
+
+@case('fireball.update[20x1000]', ops=20)
+def bench_fireballs():
+    # 20 bolas de fogo contra 1000 NPCs; uma em cada 4 acerta alguém
+    npcs = new_npcs(1000, 2000)
+    npcs.health[:] = 10 ** 9  # Ninguém morre durante o benchmark
+    rng = random.Random(SEED)
+    game = types.SimpleNamespace(npcs=npcs)
+    ability = FireballAbility()
+    starts = [(npcs[i].x - 5, npcs[i].y) if i % 4 == 0 else (rng.uniform(-2000, 2000), 5000)
+              for i in range(20)]
+
+    def run():
+        ability.fireballs = [Fireball(x, y, True, speed=15) for x, y in starts]
+        ability.update(game)
+    return run
+
+
+@case('game.frame[update+draw]', ops=10)
+def bench_frame():
+    import main
+    random.seed(SEED)
+    clock.reset()
+    game = main.Game(world_dir=None, seed=SEED)
+    game.start_new_game()
+    inputs = [InputState(held=[pygame.K_RIGHT]), InputState(held=[pygame.K_LEFT])]
+    steps = iter(range(10 ** 9))
+
+    def run():
+        for _ in range(10):
+            # Anda para um lado e para o outro (mesma área, chunks já carregados)
+            game.step(inputs[(next(steps) // 120) % 2])
+            game.draw()
+    return run
+
+
+def run_case(setup, warmup, repeat):
+    func = setup()
+    for _ in range(warmup):
+        func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def run_suite(names=None, warmup=3, repeat=15):
+    results = {}
+    for name, setup, ops in CASES:
+        if names and not any(part in name for part in names):
+            continue
+        times = run_case(setup, warmup, repeat)
+        median = statistics.median(times)
+        results[name] = {
+            'median_ms': median,
+            'mean_ms': statistics.mean(times),
+            'min_ms': min(times),
+            'max_ms': max(times),
+            'stdev_ms': statistics.stdev(times) if len(times) > 1 else 0.0,
+            'ops': ops,
+            'per_op_us': median * 1000 / ops,
+            'runs': len(times),
+        }
+        print(f"{name:<28}{median:>10.3f} ms{results[name]['per_op_us']:>12.2f} us/op", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    # Compara os melhores tempos com o baseline; retorna os casos que ficaram mais lentos
+    regressions = []
+    print()
+    print(f"{'caso':<28}{'baseline (ms)':>14}{'atual (ms)':>12}{'variação':>10}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<28}{'-':>14}{result['min_ms']:>12.3f}{'novo':>10}")
+            continue
+        before = baseline[name]['min_ms']
+        change = result['min_ms'] / before - 1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  <- regressão'
+        print(f"{name:<28}{before:>14.3f}{result['min_ms']:>12.3f}{change:>+9.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do jogo")
+    parser.add_argument('--output', help="Grava os resultados neste arquivo JSON")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Arquivo de baseline")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Grava os resultados como o novo baseline")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Aumento máximo aceito do melhor tempo em relação ao baseline (0.10 = 10%%)")
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=15)
+    parser.add_argument('cases', nargs='*', help="Roda só os casos cujo nome contém estes textos")
+    args = parser.parse_args()
+
+    results = run_suite(args.cases, args.warmup, args.repeat)
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pygame': pygame.version.ver,
+            'seed': SEED,
+            'warmup': args.warmup,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline gravado em {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nSem baseline em {args.baseline} (use --save-baseline para criar)")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} caso(s) mais lento(s) que o baseline além de {args.threshold:.0%}")
+        return 1
+    print("\nNenhuma regressão")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+import math
+import os
+import random
+import sys
+import time
+
+# Permite rodar direto da raiz do projeto: python benchmarks/bench_tile_lookup.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from game.map import GameMap
+
+# Micro-benchmark de GameMap.get_tile_at: chamadas por segundo.
+# "antes" reproduz o caminho antigo (math.floor + chave f-string + dict);
+# "depois" usa o GameMap atual.
+
+CALLS = 200000
+
+
+def legacy_get_tile_at(game_map, chunks, world_x, world_y):
+    # Caminho de busca original, com chaves em string
+    chunk_x = math.floor(world_x / (game_map.tile_size * game_map.chunk_size))
+    chunk_y = math.floor(world_y / (game_map.tile_size * game_map.chunk_size))
+    tile_x = int(world_x - chunk_x * game_map.tile_size * game_map.chunk_size) // game_map.tile_size
+    tile_y = int(world_y - chunk_y * game_map.tile_size * game_map.chunk_size) // game_map.tile_size
+    if tile_x < 0:
+        tile_x += game_map.chunk_size
+        chunk_x -= 1
+    if tile_y < 0:
+        tile_y += game_map.chunk_size
+        chunk_y -= 1
+    key = f"{chunk_x},{chunk_y}"
+    tiles = chunks.get(key)
+    if tiles is None:
+        # Guarda os tiles como listas de strings, o formato antigo
+        tiles = chunks[key] = game_map.get_or_create_chunk(chunk_x, chunk_y).tiles
+    return tiles[tile_y][tile_x]
+
+
+def measure(func, points):
+    start = time.perf_counter()
+    for x, y in points:
+        func(x, y)
+    return len(points) / (time.perf_counter() - start)
+
+
+def main():
+    random.seed(1)
+    pygame.init()
+    game_map = GameMap()
+    game_map.update_chunks(0, 0)
+
+    # Pontos próximos (como a colisão do jogador) e espalhados pela janela de visão
+    near = [(400 + random.uniform(-30, 30), 300 + random.uniform(-30, 30)) for _ in range(CALLS)]
+    spread = [(random.uniform(-1500, 1500), random.uniform(-1500, 1500)) for _ in range(CALLS)]
+
+    legacy_chunks = {}
+    for x, y in spread:
+        legacy_get_tile_at(game_map, legacy_chunks, x, y)
+    for x, y in spread:
+        game_map.get_tile_at(x, y)
+
+    print(f"{'caso':<28}{'antes (chamadas/s)':>20}{'depois (chamadas/s)':>22}{'ganho':>8}")
+    for name, points in (("mesmo chunk", near), ("chunks variados", spread)):
+        before = measure(lambda x, y: legacy_get_tile_at(game_map, legacy_chunks, x, y), points)
+        after = measure(game_map.get_tile_at, points)
+        print(f"{name:<28}{before:>20,.0f}{after:>22,.0f}{after / before:>7.1f}x")
+        ids = measure(game_map.get_tile_id_at, points)
+        print(f"{name + ' (get_tile_id_at)':<28}{'':>20}{ids:>22,.0f}{ids / before:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import os
+import pygame
+
+# Sprites do jogo: (arquivo em assets/images, tamanho, espelhado na horizontal).
+# preload() carrega todos de uma vez (no menu), para nenhum spawn ler o disco
+SPRITES = [
+    ('magic.png', (40, 60), False),  # Jogador
+    ('magic.png', (40, 60), True),
+    ('npc.png', (48, 48), False),
+    ('npc.png', (48, 48), True),
+    ('piranha-fish.png', (32, 32), False),
+    ('items/potion.png', None, False),
+]
+
+class AssetManager:
+    # Cache de imagens compartilhado por todas as entidades: cada arquivo é lido
+    # do disco uma vez e cada variação (tamanho, espelhada) é criada uma vez;
+    # todos recebem a mesma Surface, que não deve ser alterada
+    def __init__(self, root=os.path.join('assets', 'images')):
+        self.root = root
+        self.images = {}  # (arquivo, tamanho, espelhado) -> Surface
+        self.rotation_sets = {}  # (arquivo, tamanho, ângulos) -> Rotations
+        self.files_loaded = 0  # Leituras do disco
+
+    def image(self, name, size=None, flip_x=False):
+        key = (name, size, flip_x)
+        image = self.images.get(key)
+        if image is None:
+            if flip_x:
+                image = pygame.transform.flip(self.image(name, size), True, False)
+            elif size is not None:
+                image = pygame.transform.scale(self.image(name), size)
+            else:
+                image = self.load(name)
+            self.images[key] = image
+        return image
+
+    def rotations(self, name, size=None, steps=64):
+        # Imagem girada em steps ângulos, criadas uma vez e compartilhadas por
+        # todas as entidades que usam o mesmo sprite (ver Rotations)
+        key = (name, size, steps)
+        rotations = self.rotation_sets.get(key)
+        if rotations is None:
+            rotations = self.rotation_sets[key] = Rotations(self.image(name, size), steps)
+        return rotations
+
+    def load(self, name):
+        image = pygame.image.load(os.path.join(self.root, name))
+        self.files_loaded += 1
+        # Converte para o formato da tela (blits mais rápidos); sem janela
+        # (simulação headless) a imagem fica como foi lida
+        if pygame.display.get_surface() is not None:
+            image = image.convert_alpha()
+        return image
+
+    def preload(self, sprites=SPRITES):
+        for name, size, flip_x in sprites:
+            self.image(name, size, flip_x)
+
+    def clear(self):
+        self.images.clear()
+        self.rotation_sets.clear()
+
+class Rotations:
+    # Uma imagem pré-girada em steps ângulos igualmente espaçados. get(angle)
+    # retorna a mais próxima do ângulo pedido (em graus, sentido anti-horário
+    # como pygame.transform.rotate) e o deslocamento do centro até o canto dela:
+    # cada imagem girada tem um tamanho, e desenhar em centro + deslocamento
+    # mantém o sprite centrado no mesmo ponto em qualquer ângulo
+    def __init__(self, image, steps=64):
+        self.steps = steps
+        self.step_angle = 360 / steps
+        self.frames = []
+        for step in range(steps):
+            rotated = pygame.transform.rotate(image, step * self.step_angle)
+            offset = (-(rotated.get_width() // 2), -(rotated.get_height() // 2))
+            self.frames.append((rotated, offset))
+
+    def get(self, angle):
+        return self.frames[round(angle / self.step_angle) % self.steps]
+
+# Cache único do jogo (como o profiler, um só para todos os módulos)
+assets = AssetManager()
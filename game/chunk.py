@@ -0,0 +1,219 @@
+import numpy as np
+from .noise import noise2_points
+from .tiles import TILE_TYPES, TILE_NAMES, TILE_FLAGS, SWIMMABLE, WATER, GRASS, FOREST, PATH, CASTLE, tile_id
+
+# Geração e armazenamento dos tiles de um chunk; não depende do pygame, então
+# pode rodar sem tela (ex.: pregen.py gerando o mundo em vários processos)
+
+# Tipo de terreno de cada faixa de ruído (ver Chunk.generate_chunk)
+TERRAIN_BY_BAND = np.array([WATER, GRASS, FOREST, PATH, GRASS], dtype=np.uint8)
+
+class Chunk:
+    def __init__(self, x, y, tile_size, width, height, noise_gen, tile_ids=None):
+        self.x = x  # Coordenada x do chunk no mundo
+        self.y = y  # Coordenada y do chunk no mundo
+        self.tile_size = tile_size
+        self.width = width
+        self.height = height
+        self.noise_gen = noise_gen  # Usa o mesmo gerador de ruído do GameMap
+        # IDs dos tiles (ver game/tiles.py), um byte por tile. tile_ids é um array
+        # indexado por [y, x]; tile_bytes é o mesmo buffer visto como bytearray,
+        # mais rápido para leituras individuais (índice y * width + x).
+        # Se os tiles já vierem prontos (gerados aos poucos), não gera de novo
+        if tile_ids is None:
+            tile_ids = self.generate_chunk()
+        self.tile_bytes = bytearray(np.ascontiguousarray(tile_ids, dtype=np.uint8).tobytes())
+        self.tile_ids = np.frombuffer(self.tile_bytes, dtype=np.uint8).reshape(height, width)
+        
+        # Imagem pré-renderizada com todos os tiles do chunk (criada pelo GameMap)
+        self.surface = None
+        self.dirty_tiles = set()  # Tiles alterados que ainda precisam ser redesenhados na imagem
+        self.modified = False  # Alterado desde que foi gerado/carregado (precisa ser salvo)
+        self.water = None  # Máscara de água em cache (ver water_mask)
+        self.spawns = None  # Índice de pontos de spawn em cache (ver spawn_index)
+        
+    @property
+    def tiles(self):
+        # Compatibilidade: os tiles como listas de nomes ('water', 'grass', ...)
+        return [[TILE_NAMES[tile] for tile in row] for row in self.tile_ids.tolist()]
+        
+    @property
+    def water_mask(self):
+        # Tiles onde se nada (bool, [y, x]); calculada uma vez e refeita quando um tile muda
+        if self.water is None:
+            self.water = (TILE_FLAGS[self.tile_ids] & SWIMMABLE) != 0
+        return self.water
+        
+    @property
+    def spawn_index(self):
+        # Corpos de água e tiles de terra do chunk (ver SpawnIndex); refeito quando um tile muda
+        if self.spawns is None:
+            self.spawns = SpawnIndex(self.tile_ids)
+        return self.spawns
+        
+    def get_tile(self, tile_x, tile_y):
+        return TILE_NAMES[self.tile_bytes[tile_y * self.width + tile_x]]
+        
+    def set_tile(self, tile_x, tile_y, tile_type):
+        # Aceita o nome ou o ID do tile
+        new_id = tile_id(tile_type)
+        if self.tile_ids[tile_y, tile_x] != new_id:
+            self.tile_ids[tile_y, tile_x] = new_id
+            self.modified = True
+            self.water = None
+            self.spawns = None
+            if self.surface is not None:
+                self.dirty_tiles.add((tile_x, tile_y))
+                
+    def invalidate_surface(self):
+        # Força a imagem do chunk a ser recriada no próximo desenho
+        self.release_surface()
+        
+    def release_surface(self):
+        self.surface = None
+        self.dirty_tiles.clear()
+        
+    def generate_chunk(self):
+        tiles = generate_terrain(self.noise_gen, self.x, self.y, self.width, self.height)
+        place_castles(self.noise_gen, self.x, self.y, tiles)
+        return tiles
+
+class SpawnIndex:
+    # Onde algo pode surgir dentro de um chunk, para sortear pontos de spawn sem
+    # consultar tile por tile: os corpos de água (tiles de água conectados pelos
+    # lados) e os tiles de terra de cada tipo. Os tiles são índices y * width + x.
+    # Os corpos de água são os do chunk sozinho; um lago que passa da borda é
+    # unido às partes nos chunks vizinhos por connect_water_bodies
+    def __init__(self, tile_ids):
+        flat = tile_ids.ravel()
+        water = (TILE_FLAGS[tile_ids] & SWIMMABLE) != 0
+        
+        # Número do corpo de água de cada tile (0, 1, ...; -1 fora da água) e
+        # um array de tiles por corpo
+        water_tiles = np.flatnonzero(water)
+        _, bodies = np.unique(label_regions(water).ravel()[water_tiles], return_inverse=True)
+        self.water_labels = np.full(tile_ids.shape, -1, dtype=np.int64)
+        self.water_labels.ravel()[water_tiles] = bodies
+        order = np.argsort(bodies, kind='stable')
+        starts = np.flatnonzero(np.diff(bodies[order])) + 1
+        self.water_bodies = np.split(water_tiles[order], starts) if len(water_tiles) else []
+        
+        # Tiles de terra por tipo (ID do tile -> array de tiles)
+        self.land_tiles = {}
+        for tile in TILE_TYPES:
+            if not tile.flags & SWIMMABLE:
+                tiles = np.flatnonzero(flat == tile.id)
+                if len(tiles):
+                    self.land_tiles[tile.id] = tiles
+
+def label_regions(mask):
+    # Rótulo de cada região conectada (4-vizinhos) de mask: o menor índice de
+    # tile da região; fora de mask o rótulo é mask.size. Propaga o menor rótulo
+    # entre vizinhos até nada mudar (poucas passadas num chunk de 12x12)
+    outside = mask.size
+    labels = np.where(mask, np.arange(mask.size).reshape(mask.shape), outside)
+    while True:
+        spread = labels.copy()
+        np.minimum(spread[1:, :], labels[:-1, :], out=spread[1:, :])
+        np.minimum(spread[:-1, :], labels[1:, :], out=spread[:-1, :])
+        np.minimum(spread[:, 1:], labels[:, :-1], out=spread[:, 1:])
+        np.minimum(spread[:, :-1], labels[:, 1:], out=spread[:, :-1])
+        spread[~mask] = outside
+        if np.array_equal(spread, labels):
+            return labels
+        labels = spread
+
+def connect_water_bodies(indexes):
+    # Tamanho total de cada corpo de água somando as partes nos chunks vizinhos:
+    # indexes é {(chunk x, chunk y): SpawnIndex}, e os corpos que se tocam na
+    # borda entre dois desses chunks são unidos (union-find). Retorna, por
+    # chunk, um array com o tamanho total de cada um dos seus corpos
+    offsets = {}
+    sizes = []
+    for key, index in indexes.items():
+        offsets[key] = len(sizes)
+        sizes.extend(len(body) for body in index.water_bodies)
+    parent = list(range(len(sizes)))
+    
+    def find(body):
+        while parent[body] != body:
+            parent[body] = parent[parent[body]]
+            body = parent[body]
+        return body
+    
+    for (chunk_x, chunk_y), index in indexes.items():
+        # Borda direita com a esquerda do vizinho, borda de baixo com a de cima
+        for neighbour_key, edge, neighbour_edge in (((chunk_x + 1, chunk_y), np.s_[:, -1], np.s_[:, 0]),
+                                                    ((chunk_x, chunk_y + 1), np.s_[-1, :], np.s_[0, :])):
+            neighbour = indexes.get(neighbour_key)
+            if neighbour is None:
+                continue
+            bodies = index.water_labels[edge]
+            neighbour_bodies = neighbour.water_labels[neighbour_edge]
+            touching = (bodies >= 0) & (neighbour_bodies >= 0)
+            for body, neighbour_body in set(zip(bodies[touching].tolist(), neighbour_bodies[touching].tolist())):
+                root = find(offsets[(chunk_x, chunk_y)] + body)
+                neighbour_root = find(offsets[neighbour_key] + neighbour_body)
+                if root != neighbour_root:
+                    parent[neighbour_root] = root
+    
+    totals = [0] * len(sizes)
+    for body, size in enumerate(sizes):
+        totals[find(body)] += size
+    return {key: np.array([totals[find(offsets[key] + body)] for body in range(len(index.water_bodies))],
+                          dtype=np.int64)
+            for key, index in indexes.items()}
+
+def generate_terrain(noise_gen, chunk_x, chunk_y, width, height, start_row=0, end_row=None):
+    # Gera o terreno das linhas [start_row, end_row) de um chunk; permite gerar
+    # um chunk aos poucos, algumas linhas por vez (ver ChunkScheduler)
+    if end_row is None:
+        end_row = height
+        
+    # Parâmetros ajustados para melhor definição do terreno
+    scale = 25.0
+    water_threshold = -0.35
+    forest_threshold = 0.2
+    path_threshold = 0.35
+    
+    # Offset grande o suficiente para evitar problemas com números negativos
+    world_offset = 10000
+    
+    # Coordenadas absolutas no mundo das colunas e linhas pedidas
+    world_x = np.arange(width) + (chunk_x + world_offset) * width
+    world_y = np.arange(start_row, end_row) + (chunk_y + world_offset) * height
+    
+    # Usar múltiplas camadas de ruído para mais variedade; as duas camadas
+    # são amostradas numa única chamada (linha × coluna se expandem por
+    # broadcasting para a grade completa)
+    layers = noise2_points(noise_gen,
+                           np.stack((world_x / scale, world_x / (scale/2)))[:, np.newaxis, :],
+                           np.stack((world_y / scale, world_y / (scale/2)))[:, :, np.newaxis])
+    base_value = layers[0]
+    detail_value = layers[1] * 0.5
+    value = (base_value + detail_value) / 1.5
+    
+    # Determinar tipo de terreno: água < -0.35 <= grama < 0 <= floresta < 0.2 <= caminho < 0.35 <= grama
+    terrain = np.digitize(value, [water_threshold, 0, forest_threshold, path_threshold])
+    return TERRAIN_BY_BAND[terrain]
+
+def place_castles(noise_gen, chunk_x, chunk_y, tiles):
+    # Coloca castelos no terreno completo de um chunk (altera tiles)
+    castle_chance = 0.001
+    
+    # Castelos só em grama, longe da água (nenhuma água na vizinhança 3x3);
+    # a vizinhança é calculada separando linhas e colunas
+    water = tiles == WATER
+    has_water_nearby = water.copy()
+    has_water_nearby[1:, :] |= water[:-1, :]
+    has_water_nearby[:-1, :] |= water[1:, :]
+    rows = has_water_nearby.copy()
+    has_water_nearby[:, 1:] |= rows[:, :-1]
+    has_water_nearby[:, :-1] |= rows[:, 1:]
+    
+    # Sorteio dos castelos derivado do seed do mundo e da posição do chunk,
+    # para que o mesmo seed gere sempre os mesmos tiles
+    rng = np.random.default_rng([noise_gen.get_seed() & 0xFFFFFFFF,
+                                 chunk_x & 0xFFFFFFFF, chunk_y & 0xFFFFFFFF])
+    castles = (tiles == GRASS) & (rng.random(tiles.shape) < castle_chance) & ~has_water_nearby
+    tiles[castles] = CASTLE
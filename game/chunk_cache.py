@@ -0,0 +1,94 @@
+from collections import OrderedDict
+
+class ChunkCache:
+    def __init__(self, max_chunks=128):
+        self.max_chunks = max_chunks  # Orçamento: número máximo de chunks na memória
+        self.chunks = OrderedDict()  # Do menos para o mais recentemente usado
+        self.protected = set()  # Chunks que não podem ser removidos (perto do jogador)
+        self.pinned = set()  # Chunks fixos na memória (área de spawn), além dos protegidos
+        self.on_evict = None  # Callback opcional chamado com (key, chunk) ao remover
+
+        # Contadores para dimensionar o cache
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        return key in self.chunks
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def values(self):
+        return self.chunks.values()
+
+    def get(self, key):
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.chunks.move_to_end(key)
+        return chunk
+
+    def touch(self, key):
+        # Marca o chunk como usado agora, sem contar nos hits/misses (para os
+        # acessos de manutenção a cada frame); retorna o chunk ou None
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+        return chunk
+
+    def put(self, key, chunk):
+        self.chunks[key] = chunk
+        self.chunks.move_to_end(key)
+        self.trim()
+
+    def protect(self, keys):
+        # Substitui o conjunto de chunks protegidos (janela de visão + margem)
+        self.protected = set(keys)
+
+    def pin(self, keys):
+        # Fixa chunks na memória até o fim do jogo (não mudam com o jogador)
+        self.pinned.update(keys)
+
+    def trim(self):
+        # Remove os chunks menos usados até caber no orçamento, pulando os protegidos
+        if len(self.chunks) <= self.max_chunks:
+            return
+        for key in list(self.chunks):
+            if len(self.chunks) <= self.max_chunks:
+                break
+            if key not in self.protected and key not in self.pinned:
+                self.evict(key)
+
+    def evict(self, key):
+        chunk = self.chunks.pop(key)
+        self.evictions += 1
+        if self.on_evict:
+            self.on_evict(key, chunk)
+
+    def clear(self):
+        for key in list(self.chunks):
+            self.evict(key)
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'chunks': len(self.chunks),
+            'max_chunks': self.max_chunks,
+            'protected': len(self.protected),
+            'pinned': len(self.pinned),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+
+class ChunkLoader:
+    def __init__(self, build_chunk, workers=2):
+        # build_chunk(chunk_x, chunk_y) gera um chunk; precisa depender só das
+        # coordenadas e do seed para que o resultado seja o mesmo em qualquer thread
+        self.build_chunk = build_chunk
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='chunk-loader')
+        self.pending = {}  # Chunks pedidos e ainda não entregues, por chave
+
+    @property
+    def pending_count(self):
+        return len(self.pending)
+
+    def is_pending(self, key):
+        return key in self.pending
+
+    def set_focus(self, chunk_x, chunk_y):
+        # O executor atende os pedidos na ordem; o GameMap já pede os mais próximos primeiro
+        pass
+
+    def request(self, key):
+        if key not in self.pending:
+            self.pending[key] = self.executor.submit(self.build_chunk, *key)
+
+    def poll(self):
+        # Entrega os chunks já prontos sem bloquear
+        ready = [key for key, future in self.pending.items() if future.done()]
+        return [(key, self.pending.pop(key).result()) for key in ready]
+
+    def wait(self, key):
+        # Bloqueia até o chunk pedido ficar pronto (usado quando ele é necessário já)
+        return self.pending.pop(key).result()
+
+    def cancel_except(self, keys):
+        # Cancela pedidos que ainda não começaram e não estão mais em keys
+        for key in [key for key in self.pending if key not in keys]:
+            if self.pending[key].cancel():
+                del self.pending[key]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.pending.clear()
@@ -0,0 +1,80 @@
+import time
+import numpy as np
+
+class ChunkJob:
+    def __init__(self, key, width, height):
+        self.key = key
+        self.tiles = np.empty((height, width), dtype=np.uint8)
+        self.next_row = 0  # Próxima linha a ser gerada
+
+class ChunkScheduler:
+    # Alternativa ao ChunkLoader sem threads: gera os chunks pedidos aos poucos,
+    # linha a linha, dentro de um orçamento de tempo por frame. Tem a mesma
+    # interface (request, poll, wait, ...) para ser usado pelo GameMap.
+    def __init__(self, generate_rows, finish_chunk, width, height, budget_ms=2.0):
+        # generate_rows(chunk_x, chunk_y, start_row, end_row) -> array de tiles das linhas
+        # finish_chunk(chunk_x, chunk_y, tiles) -> Chunk pronto (castelos, etc.)
+        self.generate_rows = generate_rows
+        self.finish_chunk = finish_chunk
+        self.width = width
+        self.height = height
+        self.budget = budget_ms / 1000.0
+        self.jobs = {}  # Chunks em geração, por chave
+        self.focus = (0, 0)  # Chunk da câmera: os mais próximos são gerados primeiro
+        self.row_cost = 0.0001  # Estimativa (média móvel) do custo de uma linha, em segundos
+
+    @property
+    def pending_count(self):
+        return len(self.jobs)
+
+    def is_pending(self, key):
+        return key in self.jobs
+
+    def set_focus(self, chunk_x, chunk_y):
+        self.focus = (chunk_x, chunk_y)
+
+    def request(self, key):
+        if key not in self.jobs:
+            self.jobs[key] = ChunkJob(key, self.width, self.height)
+
+    def distance(self, key):
+        return (key[0] - self.focus[0]) ** 2 + (key[1] - self.focus[1]) ** 2
+
+    def run_job(self, job, rows):
+        end_row = min(job.next_row + rows, self.height)
+        job.tiles[job.next_row:end_row] = self.generate_rows(job.key[0], job.key[1], job.next_row, end_row)
+        job.next_row = end_row
+
+    def poll(self):
+        # Gera linhas dos chunks pendentes, o mais próximo da câmera primeiro, até
+        # esgotar o orçamento do frame; retorna os chunks que ficaram prontos
+        ready = []
+        start = time.perf_counter()
+        deadline = start + self.budget
+        now = start
+        while self.jobs and now < deadline:
+            job = min(self.jobs.values(), key=lambda job: self.distance(job.key))
+            # Quantas linhas cabem no tempo que resta (pelo menos uma)
+            rows = max(1, int((deadline - now) / self.row_cost))
+            rows = min(rows, self.height - job.next_row)
+            self.run_job(job, rows)
+            elapsed = time.perf_counter() - now
+            self.row_cost = (self.row_cost + elapsed / rows) / 2
+            if job.next_row >= self.height:
+                del self.jobs[job.key]
+                ready.append((job.key, self.finish_chunk(job.key[0], job.key[1], job.tiles)))
+            now = time.perf_counter()
+        return ready
+
+    def wait(self, key):
+        # Termina o chunk imediatamente (quando ele é necessário neste frame)
+        job = self.jobs.pop(key)
+        self.run_job(job, self.height)
+        return self.finish_chunk(key[0], key[1], job.tiles)
+
+    def cancel_except(self, keys):
+        for key in [key for key in self.jobs if key not in keys]:
+            del self.jobs[key]
+
+    def shutdown(self):
+        self.jobs.clear()
@@ -0,0 +1,25 @@
+# Relógio da simulação, em milissegundos. A lógica do jogo usa get_ticks()
+# daqui em vez de pygame.time.get_ticks(): o tempo só avança quando o Game
+# executa um passo (Game.step), então a simulação pode rodar sem tela e
+# mais rápido (ou mais devagar) que o tempo real.
+now = 0.0
+
+# Duração de referência de um passo (60 por segundo). Velocidades e taxas do
+# jogo são dadas por passo de referência e escaladas por dt / FRAME_MS, então
+# a simulação se comporta igual com qualquer taxa de passos.
+FRAME_MS = 1000 / 60
+
+
+def get_ticks():
+    return int(now)
+
+
+def advance(dt):
+    # Avança o relógio dt milissegundos
+    global now
+    now += dt
+
+
+def reset(time=0.0):
+    global now
+    now = time
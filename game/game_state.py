@@ -1,4 +1,5 @@
 import pygame
+from .text import text_cache
 
 class GameState:
     MENU = "MENU"
@@ -6,7 +7,7 @@ class GameState:
     PAUSED = "PAUSED"
     INVENTORY = "INVENTORY"
     
-    def __init__(self):
+    def __init__(self, headless=False):
         self.current_state = self.MENU
         self.score = 0
         self.discovered_tiles = set()  # Para pontuação de exploração
@@ -14,7 +15,6 @@ class GameState:
         self.inventory = []
         self.current_quest = None
         self.completed_quests = set()
-        self.font = pygame.font.Font(None, 36)
         
         # Configurações
         self.sound_enabled = True
@@ -35,9 +35,9 @@ class GameState:
     
     def draw_menu(self, screen):
         screen.fill((0, 0, 0))
-        title = self.font.render("Andre Pereira's Adventure", True, (255, 255, 255))
-        start = self.font.render("Pressione ENTER para começar", True, (255, 255, 255))
-        controls = self.font.render("Setas: Mover    Espaço: Pular    I: Inventário    ESC: Pausar", True, (255, 255, 255))
+        title = text_cache.render("Andre Pereira's Adventure", 36, (255, 255, 255))
+        start = text_cache.render("Pressione ENTER para começar", 36, (255, 255, 255))
+        controls = text_cache.render("Setas: Mover    Espaço: Pular    I: Inventário    ESC: Pausar", 36, (255, 255, 255))
         
         screen.blit(title, (screen.get_width()/2 - title.get_width()/2, screen.get_height()/3))
         screen.blit(start, (screen.get_width()/2 - start.get_width()/2, screen.get_height()/2))
@@ -50,8 +50,8 @@ class GameState:
         overlay.set_alpha(128)
         screen.blit(overlay, (0, 0))
         
-        pause_text = self.font.render("JOGO PAUSADO", True, (255, 255, 255))
-        resume_text = self.font.render("Pressione ESC para continuar", True, (255, 255, 255))
+        pause_text = text_cache.render("JOGO PAUSADO", 36, (255, 255, 255))
+        resume_text = text_cache.render("Pressione ESC para continuar", 36, (255, 255, 255))
         
         screen.blit(pause_text, (screen.get_width()/2 - pause_text.get_width()/2, screen.get_height()/2 - 50))
         screen.blit(resume_text, (screen.get_width()/2 - resume_text.get_width()/2, screen.get_height()/2 + 50))
@@ -63,11 +63,11 @@ class GameState:
         overlay.set_alpha(200)
         screen.blit(overlay, (0, 0))
         
-        title = self.font.render("Inventário", True, (255, 255, 255))
+        title = text_cache.render("Inventário", 36, (255, 255, 255))
         screen.blit(title, (screen.get_width()/2 - title.get_width()/2, 50))
         
         if not self.inventory:
-            empty_text = self.font.render("Inventário vazio", True, (200, 200, 200))
+            empty_text = text_cache.render("Inventário vazio", 36, (200, 200, 200))
             screen.blit(empty_text, (screen.get_width()/2 - empty_text.get_width()/2, screen.get_height()/2))
         else:
             # Desenha os itens do inventário em uma grade
@@ -94,13 +94,12 @@ class GameState:
                     screen.blit(scaled_image, (x+4, y+4))
                 
                 # Desenha o nome do item
-                name_text = self.font.render(item.name, True, (255, 255, 255))
+                name_text = text_cache.render(item.name, 36, (255, 255, 255))
                 screen.blit(name_text, (x, y + item_size + 5))
                 
                 # Desenha a descrição do item
-                desc_font = pygame.font.Font(None, 24)
-                desc_text = desc_font.render(item.description, True, (200, 200, 200))
+                desc_text = text_cache.render(item.description, 24, (200, 200, 200))
                 screen.blit(desc_text, (x, y + item_size + 30))
         
-        close_text = self.font.render("Pressione I para fechar", True, (200, 200, 200))
+        close_text = text_cache.render("Pressione I para fechar", 36, (200, 200, 200))
         screen.blit(close_text, (screen.get_width()/2 - close_text.get_width()/2, screen.get_height() - 50)) 
\ No newline at end of file
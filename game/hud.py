@@ -0,0 +1,110 @@
+import pygame
+from .text import text_cache
+
+class Widget:
+    # Uma parte do HUD. value() lê o estado ligado ao widget (ex.: vida e vida
+    # máxima do jogador); render(value) desenha a Surface do widget (None o
+    # esconde) e só é chamado quando o valor muda. position é (x, y) ou uma
+    # função que recebe a Surface e retorna (x, y)
+    def __init__(self, value, render, position):
+        self.value = value
+        self.render = render
+        self.position = position
+        self.current = None
+        self.surface = None
+        self.rect = None
+        self.rendered = False
+
+    def refresh(self):
+        # Renderiza de novo se o valor mudou; retorna True nesse caso
+        value = self.value()
+        if self.rendered and value == self.current:
+            return False
+        self.current = value
+        self.rendered = True
+        self.surface = self.render(value)
+        if self.surface is None:
+            self.rect = None
+        else:
+            position = self.position(self.surface) if callable(self.position) else self.position
+            self.rect = self.surface.get_rect(topleft=(round(position[0]), round(position[1])))
+        return True
+
+class Hud:
+    # HUD em modo retido: os widgets ficam numa camada transparente do tamanho
+    # da tela, recomposta só quando o valor de algum widget muda. A cada frame
+    # a camada é copiada para a tela de uma vez (só as áreas com widgets)
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.widgets = []
+        self.layer = None
+        self.regions = []  # Áreas da camada com widgets
+        self.changed = []  # Áreas que mudaram na última recomposição (antes e depois)
+        self.redraws = 0  # Recomposições da camada
+
+    def add(self, value, render, position):
+        widget = Widget(value, render, position)
+        self.widgets.append(widget)
+        return widget
+
+    def invalidate(self):
+        # Força todos os widgets a serem renderizados de novo
+        for widget in self.widgets:
+            widget.rendered = False
+
+    def update(self):
+        # Recompõe a camada se algum widget mudou; retorna as áreas alteradas
+        old_rects = [widget.rect for widget in self.widgets]
+        changed = [widget.refresh() for widget in self.widgets]
+        self.changed = []
+        if not any(changed) and self.layer is not None:
+            return self.changed
+        for old_rect, widget, is_changed in zip(old_rects, self.widgets, changed):
+            if is_changed:
+                self.changed.extend(rect for rect in (old_rect, widget.rect) if rect is not None)
+
+        if self.layer is None:
+            self.layer = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        self.layer.fill((0, 0, 0, 0))
+        for widget in self.widgets:
+            if widget.surface is not None:
+                self.layer.blit(widget.surface, widget.rect)
+        self.regions = merge_rects([widget.rect for widget in self.widgets if widget.rect is not None])
+        self.redraws += 1
+        return self.changed
+
+    def draw(self, screen):
+        self.update()
+        screen.blits([(self.layer, rect.topleft, rect) for rect in self.regions], False)
+
+def merge_rects(rects):
+    # Junta os retângulos que se sobrepõem (cada área da camada é copiada uma vez só)
+    merged = []
+    for rect in rects:
+        rect = rect.copy()
+        overlapping = rect.collidelistall(merged)
+        while overlapping:
+            for i in reversed(overlapping):
+                rect.union_ip(merged.pop(i))
+            overlapping = rect.collidelistall(merged)
+        merged.append(rect)
+    return merged
+
+def bar(width, height, fraction, background, foreground):
+    # Barra de progresso (vida, mana): fundo e a fração preenchida
+    surface = pygame.Surface((width, height))
+    surface.fill(background)
+    surface.fill(foreground, (0, 0, round(max(0.0, min(fraction, 1.0)) * width), height))
+    return surface
+
+def text_lines(lines, size, color, spacing, align='left'):
+    # Várias linhas de texto numa Surface, uma a cada spacing pixels
+    rendered = [text_cache.render(line, size, color) for line in lines]
+    width = max(surface.get_width() for surface in rendered)
+    height = spacing * (len(rendered) - 1) + rendered[-1].get_height()
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    for i, line in enumerate(rendered):
+        x = width - line.get_width() if align == 'right' else 0
+        surface.blit(line, (x, i * spacing))
+    return surface
@@ -0,0 +1,34 @@
+import pygame
+
+# Teclas seguradas que a simulação consulta (movimento e habilidades)
+TRACKED_KEYS = [
+    pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN,
+    pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s,
+    pygame.K_q, pygame.K_e,
+]
+
+class InputState:
+    # Entrada de um passo da simulação: teclas seguradas e teclas apertadas
+    # neste passo. Pode vir do teclado (from_pygame) ou ser montada por um
+    # bot/teste, sem janela: InputState(held=[pygame.K_RIGHT])
+    def __init__(self, held=(), pressed=(), quit=False):
+        self.held = set(held)  # Teclas seguradas
+        self.pressed = list(pressed)  # Teclas apertadas neste passo (KEYDOWN), em ordem
+        self.quit = quit  # Pedido para fechar o jogo
+
+    def __getitem__(self, key):
+        # Mesmo uso de pygame.key.get_pressed(): keys[pygame.K_LEFT]
+        return key in self.held
+
+    @classmethod
+    def from_pygame(cls):
+        # Lê os eventos e o teclado do pygame (precisa de uma janela)
+        pressed = []
+        quit = False
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                quit = True
+            elif event.type == pygame.KEYDOWN:
+                pressed.append(event.key)
+        keys = pygame.key.get_pressed()
+        return cls([key for key in TRACKED_KEYS if keys[key]], pressed, quit)
@@ -1,20 +1,31 @@
 import pygame
 import math
+from . import clock
+from .assets import assets
+
+# Metade da maior hitbox de NPC: distância extra da busca por colisões
+NPC_HITBOX_REACH = 32
 
 class Item:
-    def __init__(self, name, description, image_name=None):
+    def __init__(self, name, description, image_name=None, headless=False):
         self.name = name
         self.description = description
         
+        # Sem tela (simulação headless) o item não tem imagem
+        self.image = None
+        if not headless:
+            self.load_image(image_name)
+            
+    def load_image(self, image_name):
         # Cria uma imagem padrão para o item
         self.image = pygame.Surface((32, 32))
         
         if image_name:
             try:
-                self.image = pygame.image.load(f'assets/images/items/{image_name}')
+                self.image = assets.image(f'items/{image_name}')  # Compartilhada entre os itens
             except:
                 # Se não conseguir carregar a imagem, cria uma imagem colorida
-                if "Poção" in name:
+                if "Poção" in self.name:
                     self.image.fill((255, 0, 0))  # Vermelho para poções
                 else:
                     self.image.fill((100, 100, 100))  # Cinza para outros itens
@@ -23,8 +34,8 @@ class Item:
                 pygame.draw.rect(self.image, (200, 200, 200), self.image.get_rect(), 2)
 
 class Potion(Item):
-    def __init__(self, healing_amount):
-        super().__init__("Poção de Vida", "Recupera vida quando usado", "potion.png")
+    def __init__(self, healing_amount, headless=False):
+        super().__init__("Poção de Vida", "Recupera vida quando usado", "potion.png", headless)
         self.healing_amount = healing_amount
         
     def use(self, player):
@@ -37,16 +48,28 @@ class Ability:
         self.description = description
         self.mana_cost = mana_cost
         self.cooldown = cooldown
-        self.last_used = 0
+        self.last_used = None  # Nunca usada: disponível desde o início
+        
+    def save_positions(self):
+        # Guarda as posições dos objetos da habilidade antes de um passo (interpolação)
+        pass
+        
+    def screen_rects(self, camera_x, camera_y, alpha=1.0):
+        # Áreas da tela desenhadas por draw() (para o envio parcial da tela)
+        return []
         
     def can_use(self, player):
-        current_time = pygame.time.get_ticks()
+        if self.last_used is None:
+            return True
+        current_time = clock.get_ticks()
         return (current_time - self.last_used) >= self.cooldown * 1000
 
 class Fireball:
     def __init__(self, x, y, direction, speed=10):
         self.x = x
         self.y = y
+        self.prev_x = x  # Posição no passo anterior (para interpolar o desenho)
+        self.prev_y = y
         self.width = 20
         self.height = 20
         self.speed = speed
@@ -54,15 +77,16 @@ class Fireball:
         self.distance_traveled = 0
         self.max_distance = 300  # Distância máxima que a bola de fogo pode viajar
         
-    def update(self):
+    def update(self, dt=clock.FRAME_MS):
         # Move a bola de fogo na direção correta
+        speed = self.speed * dt / clock.FRAME_MS
         if self.direction:
-            self.x += self.speed  # Move para a direita
+            self.x += speed  # Move para a direita
         else:
-            self.x -= self.speed  # Move para a esquerda
+            self.x -= speed  # Move para a esquerda
             
         # Atualiza a distância percorrida
-        self.distance_traveled += self.speed
+        self.distance_traveled += speed
         
         # Retorna False se a bola de fogo atingiu sua distância máxima
         return self.distance_traveled < self.max_distance
@@ -78,7 +102,7 @@ class FireballAbility(Ability):
         self.fireballs = []
         self.width = 20  # Largura para verificação de visibilidade
         self.height = 20  # Altura para verificação de visibilidade
-        self.explosion_duration = 30  # Duração da explosão em frames
+        self.explosion_duration = 500  # Duração da explosão (ms)
         self.explosions = []  # Lista para armazenar explosões ativas
     
     def use(self, player, game):
@@ -96,20 +120,27 @@ class FireballAbility(Ability):
         
         # Consome mana
         player.mana -= self.mana_cost
-        self.last_used = pygame.time.get_ticks()
+        self.last_used = clock.get_ticks()
         return True
         
-    def update(self, game=None):
+    def save_positions(self):
+        for fireball in self.fireballs:
+            fireball.prev_x = fireball.x
+            fireball.prev_y = fireball.y
+        
+    def update(self, game=None, dt=clock.FRAME_MS):
         # Atualiza todas as bolas de fogo ativas e remove as que atingiram a distância máxima
         fireballs_to_remove = []
         for fireball in self.fireballs:
-            if not fireball.update():
+            if not fireball.update(dt):
                 fireballs_to_remove.append(fireball)
                 continue
                 
-            # Verifica colisão com NPCs se o game foi fornecido
+            # Verifica colisão com NPCs se o game foi fornecido; só os NPCs perto
+            # da bola de fogo, consultados no NPCSystem do Game
             if game:
-                for npc in game.npcs:
+                reach = fireball.width/2 + NPC_HITBOX_REACH
+                for npc in game.npcs.query_radius(fireball.x, fireball.y, reach):
                     if self.check_collision(fireball, npc):
                         # Cria uma explosão na posição da colisão
                         self.explosions.append({
@@ -130,8 +161,8 @@ class FireballAbility(Ability):
         # Atualiza as explosões
         explosions_to_remove = []
         for explosion in self.explosions:
-            explosion['timer'] -= 1
-            explosion['radius'] = int((1 - explosion['timer'] / self.explosion_duration) * explosion['max_radius'])
+            explosion['timer'] -= dt
+            explosion['radius'] = int((1 - max(explosion['timer'], 0) / self.explosion_duration) * explosion['max_radius'])
             if explosion['timer'] <= 0:
                 explosions_to_remove.append(explosion)
         
@@ -154,11 +185,23 @@ class FireballAbility(Ability):
             return True
         return False
         
-    def draw(self, screen, camera_x, camera_y):
-        # Desenha as bolas de fogo
+    def screen_rects(self, camera_x, camera_y, alpha=1.0):
+        rects = []
+        for fireball in self.fireballs:
+            screen_x = fireball.prev_x + (fireball.x - fireball.prev_x) * alpha - camera_x
+            screen_y = fireball.prev_y + (fireball.y - fireball.prev_y) * alpha - camera_y
+            rects.append(pygame.Rect(int(screen_x) - 11, int(screen_y) - 11, 22, 22))
+        for explosion in self.explosions:
+            radius = explosion['max_radius'] + 1
+            rects.append(pygame.Rect(int(explosion['x'] - camera_x) - radius,
+                                     int(explosion['y'] - camera_y) - radius, radius * 2, radius * 2))
+        return rects
+        
+    def draw(self, screen, camera_x, camera_y, alpha=1.0):
+        # Desenha as bolas de fogo, interpoladas entre o passo anterior e o atual
         for fireball in self.fireballs:
-            screen_x = fireball.x - camera_x
-            screen_y = fireball.y - camera_y
+            screen_x = fireball.prev_x + (fireball.x - fireball.prev_x) * alpha - camera_x
+            screen_y = fireball.prev_y + (fireball.y - fireball.prev_y) * alpha - camera_y
             
             # Só desenha se estiver visível na tela
             if (-fireball.width <= screen_x <= screen.get_width() + fireball.width and
@@ -203,21 +246,27 @@ class TeleportAbility(Ability):
             player.x += distance
         else:
             player.x -= distance
+        # Um salto, não um movimento: o desenho não interpola entre as posições
+        player.prev_x = player.x
+        player.prev_y = player.y
+        # A câmera pula junto: o mapa é desenhado de novo em vez de deslocado
+        if game is not None:
+            game.game_map.invalidate_view()
             
-        self.last_used = pygame.time.get_ticks()
+        self.last_used = clock.get_ticks()
         return True
         
-    def update(self, game=None):
+    def update(self, game=None, dt=clock.FRAME_MS):
         # O teleporte não precisa de atualização contínua
         pass
         
-    def draw(self, screen, camera_x, camera_y):
+    def draw(self, screen, camera_x, camera_y, alpha=1.0):
         # O teleporte não tem representação visual contínua
         pass
 
 # Lista de todos os itens disponíveis no jogo
 ITEMS = {
-    'potion': lambda: Potion(3),  # Recupera 3 de vida
+    'potion': lambda headless=False: Potion(3, headless),  # Recupera 3 de vida
 }
 
 # Lista de todas as habilidades disponíveis no jogo
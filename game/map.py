@@ -2,149 +2,438 @@ import pygame
 import os
 import random
 import math
+import threading
+from collections import OrderedDict
+import numpy as np
 from opensimplex import OpenSimplex
-
-class Chunk:
-    def __init__(self, x, y, tile_size, width, height, noise_gen):
-        self.x = x  # Coordenada x do chunk no mundo
-        self.y = y  # Coordenada y do chunk no mundo
-        self.tile_size = tile_size
-        self.width = width
-        self.height = height
-        self.noise_gen = noise_gen  # Usa o mesmo gerador de ruído do GameMap
-        self.tiles = self.generate_chunk()
-        
-    def generate_chunk(self):
-        tiles = [[None for x in range(self.width)] for y in range(self.height)]
-        
-        # Parâmetros ajustados para melhor definição do terreno
-        scale = 25.0
-        water_threshold = -0.35
-        forest_threshold = 0.2
-        path_threshold = 0.35
-        castle_chance = 0.001
-        
-        # Offset grande o suficiente para evitar problemas com números negativos
-        world_offset = 10000
-        
-        for y in range(self.height):
-            for x in range(self.width):
-                # Coordenadas absolutas no mundo com offset para lidar com negativos
-                world_x = x + (self.x + world_offset) * self.width
-                world_y = y + (self.y + world_offset) * self.height
-                
-                # Usar múltiplas camadas de ruído para mais variedade
-                base_value = self.noise_gen.noise2(world_x / scale, world_y / scale)
-                detail_value = self.noise_gen.noise2(world_x / (scale/2), world_y / (scale/2)) * 0.5
-                value = (base_value + detail_value) / 1.5
-                
-                # Determinar tipo de terreno
-                if value < water_threshold:
-                    tiles[y][x] = 'water'
-                elif value < 0:
-                    tiles[y][x] = 'grass'
-                elif value < forest_threshold:
-                    tiles[y][x] = 'forest'
-                elif value < path_threshold:
-                    tiles[y][x] = 'path'
-                else:
-                    tiles[y][x] = 'grass'
-                    
-                # Castelos só em grama, longe da água
-                if tiles[y][x] == 'grass' and random.random() < castle_chance:
-                    # Verifica se há água próxima
-                    has_water_nearby = False
-                    for dy in [-1, 0, 1]:
-                        for dx in [-1, 0, 1]:
-                            check_y = y + dy
-                            check_x = x + dx
-                            if (0 <= check_y < self.height and 
-                                0 <= check_x < self.width and 
-                                tiles[check_y][check_x] == 'water'):
-                                has_water_nearby = True
-                                break
-                    if not has_water_nearby:
-                        tiles[y][x] = 'castle'
-        
-        return tiles
+from .chunk_cache import ChunkCache
+from .chunk_loader import ChunkLoader
+from .chunk_scheduler import ChunkScheduler
+from .region_store import RegionStore
+from .profiler import profiler
+from .chunk import Chunk, generate_terrain, place_castles, connect_water_bodies
+from .tiles import TILE_TYPES, TILE_NAMES, TILE_FLAGS, WATER, GRASS, FOREST, PATH, CASTLE, tile_id
 
 class GameMap:
-    def __init__(self):
+    def __init__(self, max_chunks=128, keep_alive_margin=1, generation_workers=2, generation_budget_ms=None,
+                 world_dir=None, seed=None, headless=False):
         self.tile_size = 64
         self.chunk_size = 12  # Tamanho de cada chunk em tiles
+        self.chunk_pixel_size = self.tile_size * self.chunk_size  # Tamanho de cada chunk em pixels
         self.view_distance = 2  # Quantos chunks são visíveis em cada direção
+        # Chunks a mais (além da visão) que continuam protegidos da remoção,
+        # para não serem descartados assim que saem da tela
+        self.keep_alive_margin = keep_alive_margin
         
-        # Seed fixo para garantir consistência no mapa
-        self.world_seed = random.randint(0, 1000000)
+        # Seed fixo para garantir consistência no mapa; um mundo salvo em disco
+        # (world_dir) guarda o seed com que foi criado e os chunks já gerados
+        if seed is None:
+            seed = random.randint(0, 1000000)
+        self.region_store = RegionStore(world_dir, seed, self.chunk_size) if world_dir else None
+        self.world_seed = self.region_store.seed if self.region_store else seed
         self.noise_gen = OpenSimplex(seed=self.world_seed)
         
-        # Dicionário para armazenar chunks carregados
-        self.chunks = {}
+        # Cache LRU limitado para armazenar chunks carregados
+        self.chunks = ChunkCache(max_chunks)
+        self.chunks.on_evict = self.on_chunk_evicted
+        self.center_chunk = None  # Chunk onde o jogador estava no último update_chunks
+        self.baked_chunks = {}  # Chunks que têm imagem pré-renderizada, por chave
+        
+        # Imagem do mapa em volta da câmera, reaproveitada entre frames (ver draw)
+        self.view = None
+        self.view_rect = None  # Área do mundo na imagem (None: desenhar tudo de novo)
+        self.view_margin = self.tile_size  # Pixels a mais em cada lado da tela
+        self.view_stale = {}  # (chunk_x, chunk_y) -> área do mundo a redesenhar
+        self.view_rebuilds = 0  # Vezes que a imagem foi desenhada inteira
+        
+        # Geração de chunks em segundo plano: com generation_budget_ms, os chunks são
+        # gerados aos poucos na thread principal, alguns milissegundos por frame;
+        # senão em threads (generation_workers=0 gera tudo na hora, como antes)
+        if generation_budget_ms is not None:
+            self.chunk_loader = ChunkScheduler(self.generate_chunk_rows, self.finish_chunk,
+                                               self.chunk_size, self.chunk_size, generation_budget_ms)
+        elif generation_workers > 0:
+            self.chunk_loader = ChunkLoader(self.create_chunk, generation_workers)
+        else:
+            self.chunk_loader = None
+        # O orçamento do ChunkScheduler é por frame desenhado, e a simulação pode
+        # rodar vários passos num frame: com ele, quem desenha chama
+        # install_ready_chunks uma vez por frame (ver Game.run), não update_chunks
+        self.poll_per_frame = generation_budget_ms is not None
+        self.last_player_position = None  # Usada para prever a direção do movimento
+        
+        # Último chunk consultado em get_tile_id_at: consultas seguidas costumam
+        # cair no mesmo chunk e evitam a busca no cache
+        self.last_chunk_x = None
+        self.last_chunk_y = None
+        self.last_chunk = None
         
-        # Carregar texturas
+        # Contadores acumulados (lidos por frame pelo profiler, ver Game). Os de
+        # chunks também são incrementados pelas threads de geração, com o lock
+        self.tile_lookups = 0  # Tiles consultados (get_tile_id_at e get_tiles_at)
+        self.chunks_generated = 0
+        self.chunks_loaded = 0  # Lidos do mundo salvo em disco
+        self.counter_lock = threading.Lock()
+        
+        # Tiles candidatos das últimas consultas de spawn (ver spawn_points)
+        self.spawn_queries = OrderedDict()
+        self.max_spawn_queries = 32
+        
+        # Carregar texturas (sem tela, na simulação headless, não há texturas)
         self.images = {}
-        self.load_images()
+        self.tile_images = []
+        if not headless:
+            self.load_images()
         
         # Posição da câmera (em tiles)
         self.camera_x = 0
         self.camera_y = 0
         
     def get_chunk_key(self, chunk_x, chunk_y):
-        return f"{chunk_x},{chunk_y}"
+        return (chunk_x, chunk_y)
+        
+    def load_chunk(self, chunk_x, chunk_y):
+        # Carrega o chunk do mundo salvo em disco, se ele já tiver sido gerado antes
+        if self.region_store is None:
+            return None
+        tiles = self.region_store.load(chunk_x, chunk_y)
+        if tiles is None:
+            return None
+        with self.counter_lock:
+            self.chunks_loaded += 1
+        chunk = Chunk(chunk_x, chunk_y, self.tile_size,
+                      self.chunk_size, self.chunk_size, self.noise_gen, tiles)
+        return chunk
+        
+    def create_chunk(self, chunk_x, chunk_y):
+        # Carrega ou gera um chunk; só depende do seed e das coordenadas, então
+        # pode rodar em qualquer thread e sempre produz os mesmos tiles
+        chunk = self.load_chunk(chunk_x, chunk_y)
+        if chunk is None:
+            chunk = Chunk(chunk_x, chunk_y, self.tile_size, 
+                          self.chunk_size, self.chunk_size,
+                          self.noise_gen)  # Passa o gerador de ruído
+            with self.counter_lock:
+                self.chunks_generated += 1
+            self.save_chunk(chunk)
+        return chunk
+        
+    def save_chunk(self, chunk):
+        # Grava o chunk no mundo em disco (em segundo plano)
+        if self.region_store is not None:
+            self.region_store.save_async(chunk.x, chunk.y, chunk.tile_ids)
+            chunk.modified = False
+        
+    def generate_chunk_rows(self, chunk_x, chunk_y, start_row, end_row):
+        return generate_terrain(self.noise_gen, chunk_x, chunk_y,
+                                self.chunk_size, self.chunk_size, start_row, end_row)
+        
+    def finish_chunk(self, chunk_x, chunk_y, tiles):
+        # Completa um chunk gerado aos poucos (ver ChunkScheduler)
+        place_castles(self.noise_gen, chunk_x, chunk_y, tiles)
+        chunk = Chunk(chunk_x, chunk_y, self.tile_size,
+                      self.chunk_size, self.chunk_size, self.noise_gen, tiles)
+        with self.counter_lock:
+            self.chunks_generated += 1
+        self.save_chunk(chunk)
+        return chunk
+        
+    @property
+    def pending_chunks(self):
+        # Quantos chunks foram pedidos e ainda não ficaram prontos
+        return self.chunk_loader.pending_count if self.chunk_loader else 0
         
     def get_or_create_chunk(self, chunk_x, chunk_y):
         key = self.get_chunk_key(chunk_x, chunk_y)
-        if key not in self.chunks:
-            self.chunks[key] = Chunk(chunk_x, chunk_y, self.tile_size, 
-                                   self.chunk_size, self.chunk_size,
-                                   self.noise_gen)  # Passa o gerador de ruído
-        return self.chunks[key]
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if self.chunk_loader and self.chunk_loader.is_pending(key):
+                # Já está sendo gerado em segundo plano: espera só por ele
+                chunk = self.chunk_loader.wait(key)
+            else:
+                chunk = self.create_chunk(chunk_x, chunk_y)
+            self.chunks.put(key, chunk)
+        return chunk
         
-    def update_chunks(self, player_x, player_y):
-        # Converter posição do jogador para coordenadas de chunk
-        chunk_x = int(player_x / (self.tile_size * self.chunk_size))
-        chunk_y = int(player_y / (self.tile_size * self.chunk_size))
-        
-        # Atualizar chunks visíveis
-        visible_chunks = set()
-        for y in range(chunk_y - self.view_distance, chunk_y + self.view_distance + 1):
-            for x in range(chunk_x - self.view_distance, chunk_x + self.view_distance + 1):
-                key = self.get_chunk_key(x, y)
-                visible_chunks.add(key)
+    def install_ready_chunks(self):
+        # Coloca no cache os chunks que terminaram de ser gerados, sem bloquear
+        if self.chunk_loader:
+            for key, chunk in self.chunk_loader.poll():
                 if key not in self.chunks:
-                    self.chunks[key] = Chunk(x, y, self.tile_size, 
-                                           self.chunk_size, self.chunk_size,
-                                           self.noise_gen)
-        
-        # Remover chunks fora da vista
-        keys_to_remove = []
-        for key in self.chunks:
-            if key not in visible_chunks:
-                keys_to_remove.append(key)
-        for key in keys_to_remove:
-            del self.chunks[key]
+                    self.chunks.put(key, chunk)
+                    
+    def update_chunks(self, player_x, player_y, facing_right=None):
+        # Converter posição do jogador para coordenadas de chunk
+        chunk_x = math.floor(player_x / self.chunk_pixel_size)
+        chunk_y = math.floor(player_y / self.chunk_pixel_size)
+        
+        # Direção do movimento desde o último update (setas/WASD ou teleporte);
+        # parado, usa o lado para onde o jogador olha (direção do teleporte)
+        move_x = move_y = 0
+        if self.last_player_position is not None:
+            last_x, last_y = self.last_player_position
+            move_x = (player_x > last_x) - (player_x < last_x)
+            move_y = (player_y > last_y) - (player_y < last_y)
+        self.last_player_position = (player_x, player_y)
+        if move_x == 0 and facing_right is not None:
+            move_x = 1 if facing_right else -1
+        
+        # Protege da remoção os chunks visíveis e a margem ao redor deles
+        # (só muda quando o jogador troca de chunk)
+        if (chunk_x, chunk_y) != self.center_chunk:
+            self.center_chunk = (chunk_x, chunk_y)
+            keep_distance = self.view_distance + self.keep_alive_margin
+            self.chunks.protect(
+                self.get_chunk_key(x, y)
+                for y in range(chunk_y - keep_distance, chunk_y + keep_distance + 1)
+                for x in range(chunk_x - keep_distance, chunk_x + keep_distance + 1))
+        
+        if self.chunk_loader is None:
+            # Garante que os chunks visíveis existam; os que saem da vista ficam
+            # no cache até serem removidos pelo orçamento (LRU). Os que já estão
+            # no cache só são marcados como usados (não contam como hits)
+            for y in range(chunk_y - self.view_distance, chunk_y + self.view_distance + 1):
+                for x in range(chunk_x - self.view_distance, chunk_x + self.view_distance + 1):
+                    if self.chunks.touch(self.get_chunk_key(x, y)) is None:
+                        self.get_or_create_chunk(x, y)
+        else:
+            self.chunk_loader.set_focus(chunk_x, chunk_y)
+            if not self.poll_per_frame:
+                self.install_ready_chunks()
+            # Pede os chunks visíveis que faltam (os mais próximos primeiro) e,
+            # antecipando o movimento, a próxima fileira na direção do jogador
+            # Chunks já salvos em disco são carregados na hora (só uma leitura)
+            for key in self.get_wanted_chunks(chunk_x, chunk_y, move_x, move_y):
+                if key not in self.chunks and not self.chunk_loader.is_pending(key):
+                    chunk = self.load_chunk(*key)
+                    if chunk is not None:
+                        self.chunks.put(key, chunk)
+                    else:
+                        self.chunk_loader.request(key)
+            # Pedidos que ficaram para trás (ex.: após um teleporte) são cancelados
+            self.chunk_loader.cancel_except(self.chunks.protected)
+        self.chunks.trim()
+        
+    def get_wanted_chunks(self, chunk_x, chunk_y, move_x, move_y):
+        view = self.view_distance
+        wanted = [self.get_chunk_key(x, y)
+                  for y in range(chunk_y - view, chunk_y + view + 1)
+                  for x in range(chunk_x - view, chunk_x + view + 1)]
+        wanted.sort(key=lambda key: (key[0] - chunk_x) ** 2 + (key[1] - chunk_y) ** 2)
+        reach = view + 1
+        if move_x:
+            wanted.extend(self.get_chunk_key(chunk_x + move_x * reach, y)
+                          for y in range(chunk_y - reach, chunk_y + reach + 1))
+        if move_y:
+            wanted.extend(self.get_chunk_key(x, chunk_y + move_y * reach)
+                          for x in range(chunk_x - reach, chunk_x + reach + 1))
+        return wanted
+        
+    def shutdown(self):
+        # Encerra as threads de geração de chunks e grava o que falta no disco
+        if self.chunk_loader:
+            self.chunk_loader.shutdown()
+        if self.region_store is not None:
+            for chunk in self.chunks.values():
+                if chunk.modified:
+                    self.save_chunk(chunk)
+            self.region_store.close()
             
+    def locate_tile(self, world_x, world_y):
+        # Converter coordenadas do mundo para coordenadas de chunk e de tile dentro
+        # do chunk; a divisão inteira arredonda para baixo, então as coordenadas do
+        # tile dentro do chunk são sempre positivas
+        tile_x = math.floor(world_x / self.tile_size)
+        tile_y = math.floor(world_y / self.tile_size)
+        chunk_x = tile_x // self.chunk_size
+        chunk_y = tile_y // self.chunk_size
+        return chunk_x, chunk_y, tile_x - chunk_x * self.chunk_size, tile_y - chunk_y * self.chunk_size
+        
+    def get_tile_id_at(self, world_x, world_y):
+        # Caminho rápido: é a função mais chamada do jogo (colisões, piranhas, spawns)
+        self.tile_lookups += 1
+        tile_x = math.floor(world_x / self.tile_size)
+        tile_y = math.floor(world_y / self.tile_size)
+        chunk_size = self.chunk_size
+        chunk_x = tile_x // chunk_size
+        chunk_y = tile_y // chunk_size
+        if chunk_x == self.last_chunk_x and chunk_y == self.last_chunk_y:
+            chunk = self.last_chunk
+        else:
+            chunk = self.get_or_create_chunk(chunk_x, chunk_y)
+            self.last_chunk_x = chunk_x
+            self.last_chunk_y = chunk_y
+            self.last_chunk = chunk
+        return chunk.tile_bytes[(tile_y - chunk_y * chunk_size) * chunk_size + tile_x - chunk_x * chunk_size]
+        
+    def get_tiles_at(self, xs, ys):
+        # Versão em lote de get_tile_id_at: recebe arrays de coordenadas do mundo
+        # e retorna um array (uint8) com o ID do tile de cada ponto
+        return self.sample_chunks(xs, ys, 'tile_ids', np.uint8)
+        
+    def get_water_at(self, xs, ys):
+        # Como get_tiles_at, mas lê a máscara de água em cache de cada chunk:
+        # retorna um array bool (True onde o ponto está na água)
+        return self.sample_chunks(xs, ys, 'water_mask', np.bool_)
+        
+    def sample_chunks(self, xs, ys, layer, dtype):
+        # Lê o array layer ([y, x] por tile) dos chunks nos pontos pedidos
+        tile_x = np.floor(np.asarray(xs, dtype=np.float64) / self.tile_size).astype(np.int64)
+        tile_y = np.floor(np.asarray(ys, dtype=np.float64) / self.tile_size).astype(np.int64)
+        self.tile_lookups += tile_x.size
+        if tile_x.size == 0:
+            return np.zeros(tile_x.shape, dtype=dtype)
+        chunk_x = tile_x // self.chunk_size
+        chunk_y = tile_y // self.chunk_size
+        local = (tile_y - chunk_y * self.chunk_size) * self.chunk_size + tile_x - chunk_x * self.chunk_size
+        
+        # Agrupa os pontos por chunk: cada chunk é buscado uma única vez e todos
+        # os pontos são lidos com uma só indexação
+        packed = (chunk_x << 32) | (chunk_y & 0xFFFFFFFF)
+        keys, first, inverse = np.unique(packed.ravel(), return_index=True, return_inverse=True)
+        if len(keys) == 1:
+            chunk = self.get_or_create_chunk(int(chunk_x.flat[0]), int(chunk_y.flat[0]))
+            return getattr(chunk, layer).ravel()[local]
+        tiles = np.stack([
+            getattr(self.get_or_create_chunk(int(chunk_x.flat[i]), int(chunk_y.flat[i])), layer).ravel()
+            for i in first])
+        return tiles[inverse, local.ravel()].reshape(local.shape)
+        
+    def get_tile_flags_at(self, world_x, world_y):
+        # Propriedades do tile (máscara de bits WALKABLE, SWIMMABLE, ... de game/tiles.py)
+        return TILE_FLAGS[self.get_tile_id_at(world_x, world_y)]
+        
     def get_tile_at(self, world_x, world_y):
-        # Converter coordenadas do mundo para coordenadas de chunk e tile
-        chunk_x = math.floor(world_x / (self.tile_size * self.chunk_size))
-        chunk_y = math.floor(world_y / (self.tile_size * self.chunk_size))
-        
-        # Garantir que as coordenadas do tile dentro do chunk sejam sempre positivas
-        tile_x = int(world_x - chunk_x * self.tile_size * self.chunk_size) // self.tile_size
-        tile_y = int(world_y - chunk_y * self.tile_size * self.chunk_size) // self.tile_size
-        
-        # Garantir que estamos dentro dos limites do chunk
-        if tile_x < 0:
-            tile_x += self.chunk_size
-            chunk_x -= 1
-        if tile_y < 0:
-            tile_y += self.chunk_size
-            chunk_y -= 1
-            
+        # Compatibilidade: retorna o nome do tile ('water', 'grass', ...)
+        return TILE_NAMES[self.get_tile_id_at(world_x, world_y)]
+        
+    def set_tile_at(self, world_x, world_y, tile_type):
+        # Altera um tile do mundo; a imagem do chunk é atualizada no próximo desenho
+        chunk_x, chunk_y, tile_x, tile_y = self.locate_tile(world_x, world_y)
         chunk = self.get_or_create_chunk(chunk_x, chunk_y)
-        if 0 <= tile_y < len(chunk.tiles) and 0 <= tile_x < len(chunk.tiles[0]):
-            return chunk.tiles[tile_y][tile_x]
-        return 'grass'  # Tile padrão
+        chunk.set_tile(tile_x, tile_y, tile_type)
+        self.mark_view_stale(chunk_x, chunk_y, pygame.Rect(
+            chunk_x * self.chunk_pixel_size + tile_x * self.tile_size,
+            chunk_y * self.chunk_pixel_size + tile_y * self.tile_size,
+            self.tile_size, self.tile_size))
+        
+    def load_area(self, x, y, radius):
+        # Garante na memória (gerando na hora, se preciso) e fixa no cache os
+        # chunks usados pelos spawns em volta de (x, y) (ver spawn_chunks)
+        keys = self.spawn_chunks(x, y, radius)
+        for chunk_x, chunk_y in keys:
+            self.get_or_create_chunk(chunk_x, chunk_y)
+        self.chunks.pin(keys)
+        
+    def chunks_around(self, x, y, radius):
+        # Coordenadas dos chunks que cobrem o quadrado em volta de (x, y)
+        size = self.chunk_pixel_size
+        return [(chunk_x, chunk_y)
+                for chunk_y in range(math.floor((y - radius) / size), math.floor((y + radius) / size) + 1)
+                for chunk_x in range(math.floor((x - radius) / size), math.floor((x + radius) / size) + 1)]
+        
+    def spawn_chunks(self, x, y, radius):
+        # Chunks que cobrem o quadrado em volta de (x, y) e mais um em cada lado,
+        # para os corpos de água que passam da borda serem medidos inteiros
+        return self.chunks_around(x, y, radius + self.chunk_pixel_size)
+        
+    def random_water_point(self, x, y, radius, min_body=4, rng=random):
+        # Ponto sorteado na água a até radius de (x, y), só em corpos de água com
+        # pelo menos min_body tiles; None se não houver nenhum nos chunks já
+        # conhecidos (nunca gera chunks). Os corpos são unidos entre chunks
+        # vizinhos na memória; um lago que continua além de spawn_chunks (ou
+        # em chunks fora da memória) conta só a parte conhecida
+        def build(indexes):
+            totals = connect_water_bodies(indexes)
+            candidates = []
+            for key in self.chunks_around(x, y, radius):
+                if key in indexes:
+                    candidates.extend((key, body) for body, total in zip(indexes[key].water_bodies, totals[key])
+                                      if total >= min_body)
+            return candidates
+        return self.pick_point(self.spawn_points(('water', x, y, radius, min_body), x, y, radius, build), rng)
+        
+    def random_land_point(self, x, y, radius, tile_types=None, rng=random):
+        # Ponto sorteado em terra (ou só nos tipos de tile pedidos, por nome ou
+        # ID) a até radius de (x, y); None se não houver, como random_water_point
+        wanted = None if tile_types is None else frozenset(tile_id(tile) for tile in tile_types)
+        
+        def build(indexes):
+            return [(key, tiles)
+                    for key in self.chunks_around(x, y, radius) if key in indexes
+                    for tile, tiles in indexes[key].land_tiles.items()
+                    if wanted is None or tile in wanted]
+        return self.pick_point(self.spawn_points(('land', x, y, radius, wanted), x, y, radius, build), rng)
+        
+    def spawn_points(self, query, x, y, radius, build):
+        # Tiles candidatos de uma consulta (coordenadas em tiles do mundo, com o
+        # centro a até radius de (x, y)). build recebe os SpawnIndex dos chunks
+        # de spawn_chunks na memória e retorna [((chunk x, chunk y), tiles)]. O
+        # resultado fica em cache até algum desses chunks mudar (tile alterado,
+        # chunk carregado ou removido), então as consultas repetidas só sorteiam
+        indexes = {}
+        for key in self.spawn_chunks(x, y, radius):
+            chunk = self.chunks.touch(key)
+            if chunk is not None:
+                indexes[key] = chunk.spawn_index
+        cached = self.spawn_queries.get(query)
+        if (cached is not None and cached[0].keys() == indexes.keys() and
+                all(cached[0][key] is index for key, index in indexes.items())):
+            self.spawn_queries.move_to_end(query)
+            return cached[1]
+        
+        size = self.chunk_size
+        candidates = build(indexes)
+        if candidates:
+            tiles_x = np.concatenate([chunk_x * size + tiles % size for (chunk_x, _), tiles in candidates])
+            tiles_y = np.concatenate([chunk_y * size + tiles // size for (_, chunk_y), tiles in candidates])
+            center_x = (tiles_x + 0.5) * self.tile_size
+            center_y = (tiles_y + 0.5) * self.tile_size
+            inside = (center_x - x) ** 2 + (center_y - y) ** 2 <= radius * radius
+            points = (tiles_x[inside].tolist(), tiles_y[inside].tolist())
+        else:
+            points = ([], [])
+        self.spawn_queries[query] = (indexes, points)
+        if len(self.spawn_queries) > self.max_spawn_queries:
+            self.spawn_queries.popitem(last=False)
+        return points
+        
+    def pick_point(self, points, rng):
+        # Sorteia um dos tiles candidatos (ver spawn_points) e um ponto dentro dele
+        tiles_x, tiles_y = points
+        if not tiles_x:
+            return None
+        i = rng.randrange(len(tiles_x))
+        return (tiles_x[i] * self.tile_size + rng.randrange(self.tile_size),
+                tiles_y[i] * self.tile_size + rng.randrange(self.tile_size))
+            
+    def on_chunk_evicted(self, key, chunk):
+        # Libera a imagem pré-renderizada quando o chunk sai do cache
+        self.baked_chunks.pop(key, None)
+        chunk.release_surface()
+        if chunk.modified:
+            self.save_chunk(chunk)
+        if chunk is self.last_chunk:
+            self.last_chunk_x = self.last_chunk_y = self.last_chunk = None
+        
+    def get_chunk_surface(self, key, chunk):
+        # Pré-renderiza todos os tiles do chunk numa única imagem
+        if chunk.surface is None:
+            surface = pygame.Surface((self.chunk_pixel_size, self.chunk_pixel_size))
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            surface.blits([(self.tile_images[tile], (x * self.tile_size, y * self.tile_size))
+                           for y, row in enumerate(chunk.tile_ids.tolist())
+                           for x, tile in enumerate(row)], False)
+            profiler.count('chunk_bakes')
+            chunk.surface = surface
+            self.baked_chunks[key] = chunk
+        elif chunk.dirty_tiles:
+            # Redesenha só os tiles alterados desde a última renderização
+            for x, y in chunk.dirty_tiles:
+                chunk.surface.blit(self.tile_images[chunk.tile_ids[y, x]], (x * self.tile_size, y * self.tile_size))
+            chunk.dirty_tiles.clear()
+        return chunk.surface
         
     def world_to_screen(self, world_x, world_y, camera_x, camera_y):
         screen_x = world_x - camera_x
@@ -157,30 +446,32 @@ class GameMap:
         return world_x, world_y
 
     def load_images(self):
-        # Criar texturas básicas para cada tipo de terreno
+        # Criar texturas básicas para cada tipo de terreno; os detalhes usam um
+        # gerador próprio para não consumir o random global (usado pela simulação)
+        rng = random.Random(self.world_seed)
         # Grama
         grass_img = pygame.Surface((self.tile_size, self.tile_size))
-        grass_img.fill((34, 139, 34))  # Verde escuro
+        grass_img.fill(TILE_TYPES[GRASS].color)  # Verde escuro
         # Adicionar detalhes à grama
         for _ in range(20):
-            x = random.randint(0, self.tile_size-1)
-            y = random.randint(0, self.tile_size-1)
+            x = rng.randint(0, self.tile_size-1)
+            y = rng.randint(0, self.tile_size-1)
             pygame.draw.circle(grass_img, (0, 100, 0), (x, y), 2)
         self.images['grass'] = grass_img
         
         # Caminho
         path_img = pygame.Surface((self.tile_size, self.tile_size))
-        path_img.fill((210, 180, 140))  # Marrom claro
+        path_img.fill(TILE_TYPES[PATH].color)  # Marrom claro
         # Adicionar textura de terra
         for _ in range(30):
-            x = random.randint(0, self.tile_size-1)
-            y = random.randint(0, self.tile_size-1)
+            x = rng.randint(0, self.tile_size-1)
+            y = rng.randint(0, self.tile_size-1)
             pygame.draw.circle(path_img, (180, 150, 100), (x, y), 1)
         self.images['path'] = path_img
         
         # Água
         water_img = pygame.Surface((self.tile_size, self.tile_size))
-        water_img.fill((0, 0, 139))  # Azul escuro
+        water_img.fill(TILE_TYPES[WATER].color)  # Azul escuro
         # Adicionar ondulações
         for y in range(0, self.tile_size, 8):
             for x in range(self.tile_size):
@@ -191,7 +482,7 @@ class GameMap:
         
         # Castelo
         castle_img = pygame.Surface((self.tile_size, self.tile_size))
-        castle_img.fill((169, 169, 169))  # Cinza
+        castle_img.fill(TILE_TYPES[CASTLE].color)  # Cinza
         # Adicionar detalhes do castelo
         # Muralhas principais
         pygame.draw.rect(castle_img, (120, 120, 120), (0, 0, self.tile_size, self.tile_size), 4)
@@ -228,11 +519,11 @@ class GameMap:
         
         # Floresta
         forest_img = pygame.Surface((self.tile_size, self.tile_size))
-        forest_img.fill((0, 100, 0))  # Verde muito escuro
+        forest_img.fill(TILE_TYPES[FOREST].color)  # Verde muito escuro
         # Adicionar árvores mais detalhadas
         for _ in range(3):
-            x = random.randint(10, self.tile_size-10)
-            y = random.randint(20, self.tile_size-10)
+            x = rng.randint(10, self.tile_size-10)
+            y = rng.randint(20, self.tile_size-10)
             # Tronco mais largo
             trunk_width = 6
             trunk_height = 20
@@ -245,30 +536,122 @@ class GameMap:
                                  (x, y-5-i*4), radius)
         self.images['forest'] = forest_img
         
+        # Texturas indexadas pelo ID do tile, usadas na renderização dos chunks
+        self.tile_images = [self.images[tile.name] for tile in TILE_TYPES]
+        
     def draw(self, screen, camera_x, camera_y):
-        # Calcular quais chunks estão visíveis
-        start_chunk_x = int(camera_x / (self.tile_size * self.chunk_size)) - self.view_distance
-        start_chunk_y = int(camera_y / (self.tile_size * self.chunk_size)) - self.view_distance
-        end_chunk_x = start_chunk_x + (self.view_distance * 2) + 1
-        end_chunk_y = start_chunk_y + (self.view_distance * 2) + 1
-        
-        # Desenhar todos os chunks visíveis
-        for chunk_y in range(start_chunk_y, end_chunk_y):
-            for chunk_x in range(start_chunk_x, end_chunk_x):
-                chunk = self.get_or_create_chunk(chunk_x, chunk_y)
-                
-                # Calcular posição na tela
-                chunk_screen_x = chunk_x * self.chunk_size * self.tile_size - camera_x
-                chunk_screen_y = chunk_y * self.chunk_size * self.tile_size - camera_y
+        # O mapa fica numa imagem persistente um pouco maior que a tela (view).
+        # Enquanto a câmera anda dentro da margem a imagem só é copiada para a
+        # tela; quando sai, os pixels que continuam visíveis são deslocados
+        # (Surface.scroll) e só as faixas que apareceram são desenhadas a partir
+        # dos chunks, então o custo depende da velocidade da câmera e não do
+        # tamanho da tela. Retorna True se a imagem do mapa foi redesenhada
+        # (chunk que ficou pronto, tiles alterados ou câmera fora da margem)
+        margin = self.view_margin
+        size = (screen.get_width() + 2 * margin, screen.get_height() + 2 * margin)
+        if self.view is None or self.view.get_size() != size:
+            # Primeiro desenho ou tela redimensionada
+            self.view = pygame.Surface(size)
+            if pygame.display.get_surface() is not None:
+                self.view = self.view.convert()
+            self.view_rect = None
+        
+        changed = False
+        if (self.view_rect is None or
+                not (0 <= camera_x - self.view_rect.x < 2 * margin and
+                     0 <= camera_y - self.view_rect.y < 2 * margin)):
+            # Centraliza a imagem na câmera de novo
+            self.move_view(math.floor(camera_x) - margin, math.floor(camera_y) - margin)
+            changed = True
+        if self.view_stale:
+            changed = self.refresh_view() or changed
+        
+        screen.blit(self.view, (self.view_rect.x - camera_x, self.view_rect.y - camera_y))
+        profiler.count('blits')
+        
+        # Libera as imagens dos chunks que ficaram longe da imagem (mantém um chunk de margem)
+        chunk_pixels = self.chunk_pixel_size
+        start_chunk_x = math.floor(self.view_rect.left / chunk_pixels)
+        start_chunk_y = math.floor(self.view_rect.top / chunk_pixels)
+        end_chunk_x = math.floor((self.view_rect.right - 1) / chunk_pixels)
+        end_chunk_y = math.floor((self.view_rect.bottom - 1) / chunk_pixels)
+        for key, chunk in list(self.baked_chunks.items()):
+            if not (start_chunk_x - 1 <= chunk.x <= end_chunk_x + 1 and
+                    start_chunk_y - 1 <= chunk.y <= end_chunk_y + 1):
+                del self.baked_chunks[key]
+                chunk.release_surface()
+        return changed
+        
+    def invalidate_view(self):
+        # Desenha a imagem do mapa inteira de novo no próximo draw (ex.: teleporte)
+        self.view_rect = None
+        
+    def move_view(self, x, y):
+        # Muda a origem da imagem do mapa para (x, y) no mundo: desloca os pixels
+        # que continuam na imagem e desenha só as faixas novas (tudo, se o
+        # deslocamento for maior que a imagem)
+        width, height = self.view.get_size()
+        old_rect = self.view_rect
+        self.view_rect = pygame.Rect(x, y, width, height)
+        if old_rect is None or abs(x - old_rect.x) >= width or abs(y - old_rect.y) >= height:
+            self.view_stale.clear()
+            self.paint_view(self.view_rect)
+            self.view_rebuilds += 1
+            return
+        
+        dx = x - old_rect.x
+        dy = y - old_rect.y
+        self.view.scroll(-dx, -dy)
+        if dx > 0:
+            self.paint_view(pygame.Rect(old_rect.right, y, dx, height))
+        elif dx < 0:
+            self.paint_view(pygame.Rect(x, y, -dx, height))
+        if dy > 0:
+            self.paint_view(pygame.Rect(x, old_rect.bottom, width, dy))
+        elif dy < 0:
+            self.paint_view(pygame.Rect(x, y, width, -dy))
+        
+    def paint_view(self, rect):
+        # Desenha na imagem do mapa a área rect (em pixels do mundo), chunk a chunk
+        chunk_pixels = self.chunk_pixel_size
+        for chunk_y in range(math.floor(rect.top / chunk_pixels), math.floor((rect.bottom - 1) / chunk_pixels) + 1):
+            for chunk_x in range(math.floor(rect.left / chunk_pixels), math.floor((rect.right - 1) / chunk_pixels) + 1):
+                chunk_rect = pygame.Rect(chunk_x * chunk_pixels, chunk_y * chunk_pixels, chunk_pixels, chunk_pixels)
+                area = rect.clip(chunk_rect)
+                position = (area.x - self.view_rect.x, area.y - self.view_rect.y)
+                key = self.get_chunk_key(chunk_x, chunk_y)
+                chunk = self.chunks.get(key)
+                if chunk is None:
+                    if self.chunk_loader:
+                        # Ainda sendo gerado: desenha um marcador no lugar, trocado
+                        # pelo chunk quando ele ficar pronto
+                        self.chunk_loader.request(key)
+                        self.view.fill(TILE_TYPES[GRASS].color, (position, area.size))
+                        self.mark_view_stale(chunk_x, chunk_y, area)
+                        continue
+                    chunk = self.get_or_create_chunk(chunk_x, chunk_y)
+                surface = self.get_chunk_surface(key, chunk)
+                self.view.blit(surface, position, area.move(-chunk_rect.x, -chunk_rect.y))
+                profiler.count('blits')
                 
-                # Desenhar tiles do chunk
-                for y in range(self.chunk_size):
-                    for x in range(self.chunk_size):
-                        tile_type = chunk.tiles[y][x]
-                        screen_x = chunk_screen_x + x * self.tile_size
-                        screen_y = chunk_screen_y + y * self.tile_size
-                        
-                        # Só desenhar se estiver na tela
-                        if (-self.tile_size <= screen_x <= screen.get_width() and
-                            -self.tile_size <= screen_y <= screen.get_height()):
-                            screen.blit(self.images[tile_type], (screen_x, screen_y)) 
\ No newline at end of file
+    def mark_view_stale(self, chunk_x, chunk_y, rect):
+        # Marca uma área de um chunk para ser redesenhada na imagem do mapa
+        stale = self.view_stale.get((chunk_x, chunk_y))
+        self.view_stale[(chunk_x, chunk_y)] = rect if stale is None else stale.union(rect)
+        
+    def refresh_view(self):
+        # Redesenha as áreas marcadas (marcadores de chunks que ficaram prontos,
+        # tiles alterados) que aparecem na imagem; retorna True se alguma mudou
+        changed = False
+        for (chunk_x, chunk_y), rect in list(self.view_stale.items()):
+            rect = rect.clip(self.view_rect)
+            if not rect:
+                # Saiu da imagem; é desenhada de novo quando voltar
+                del self.view_stale[(chunk_x, chunk_y)]
+                continue
+            if self.chunk_loader and self.get_chunk_key(chunk_x, chunk_y) not in self.chunks:
+                continue  # Ainda não ficou pronto
+            del self.view_stale[(chunk_x, chunk_y)]
+            self.paint_view(rect)
+            changed = True
+        return changed
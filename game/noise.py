@@ -0,0 +1,99 @@
+import numpy as np
+from opensimplex.constants import (
+    GRADIENTS2,
+    NORM_CONSTANT2,
+    SQUISH_CONSTANT2,
+    STRETCH_CONSTANT2,
+)
+
+# Versão vetorizada (NumPy) do OpenSimplex 2D.
+# O noise2array do pacote opensimplex só é rápido com numba instalado; sem
+# ele vira um loop Python ponto a ponto. Aqui as mesmas operações do
+# _noise2 original são aplicadas em arrays inteiros, na mesma ordem, para que
+# o resultado seja idêntico ao de noise2 chamado ponto a ponto.
+
+
+def _extrapolate(perm, xsb, ysb, dx, dy):
+    index = perm[(perm[xsb & 0xFF] + ysb) & 0xFF] & 0x0E
+    return GRADIENTS2[index] * dx + GRADIENTS2[index + 1] * dy
+
+
+def _contribution(perm, xsb, ysb, dx, dy):
+    attn = 2 - dx * dx - dy * dy
+    attn2 = attn * attn
+    return np.where(attn > 0, attn2 * attn2 * _extrapolate(perm, xsb, ysb, dx, dy), 0.0)
+
+
+def noise2_points(noise_gen, x, y):
+    # Amostra o ruído em cada par (x, y) de dois arrays do mesmo formato
+    perm = noise_gen._perm
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Coloca as coordenadas na grade
+    stretch_offset = (x + y) * STRETCH_CONSTANT2
+    xs = x + stretch_offset
+    ys = y + stretch_offset
+
+    # Origem do super-cell (losango)
+    xsb = np.floor(xs).astype(np.int64)
+    ysb = np.floor(ys).astype(np.int64)
+
+    squish_offset = (xsb + ysb) * SQUISH_CONSTANT2
+    xb = xsb + squish_offset
+    yb = ysb + squish_offset
+
+    xins = xs - xsb
+    yins = ys - ysb
+    in_sum = xins + yins
+
+    dx0 = x - xb
+    dy0 = y - yb
+
+    value = _contribution(perm, xsb + 1, ysb + 0, dx0 - 1 - SQUISH_CONSTANT2, dy0 - 0 - SQUISH_CONSTANT2)
+    value += _contribution(perm, xsb + 0, ysb + 1, dx0 - 0 - SQUISH_CONSTANT2, dy0 - 1 - SQUISH_CONSTANT2)
+
+    # Escolhe o vértice extra de cada ponto de acordo com o triângulo em que ele está
+    inside = in_sum <= 1
+    x_greater = xins > yins
+    zins_low = 1 - in_sum
+    zins_high = 2 - in_sum
+    near_low = (zins_low > xins) | (zins_low > yins)
+    near_high = (zins_high < xins) | (zins_high < yins)
+
+    # Triângulo (0,0)
+    low_x = np.where(near_low, np.where(x_greater, xsb + 1, xsb - 1), xsb + 1)
+    low_y = np.where(near_low, np.where(x_greater, ysb - 1, ysb + 1), ysb + 1)
+    low_dx = np.where(near_low, np.where(x_greater, dx0 - 1, dx0 + 1), dx0 - 1 - 2 * SQUISH_CONSTANT2)
+    low_dy = np.where(near_low, np.where(x_greater, dy0 + 1, dy0 - 1), dy0 - 1 - 2 * SQUISH_CONSTANT2)
+
+    # Triângulo (1,1)
+    high_x = np.where(near_high, np.where(x_greater, xsb + 2, xsb + 0), xsb)
+    high_y = np.where(near_high, np.where(x_greater, ysb + 0, ysb + 2), ysb)
+    high_dx = np.where(near_high, np.where(x_greater, dx0 - 2 - 2 * SQUISH_CONSTANT2,
+                                           dx0 + 0 - 2 * SQUISH_CONSTANT2), dx0)
+    high_dy = np.where(near_high, np.where(x_greater, dy0 + 0 - 2 * SQUISH_CONSTANT2,
+                                           dy0 - 2 - 2 * SQUISH_CONSTANT2), dy0)
+
+    xsv_ext = np.where(inside, low_x, high_x)
+    ysv_ext = np.where(inside, low_y, high_y)
+    dx_ext = np.where(inside, low_dx, high_dx)
+    dy_ext = np.where(inside, low_dy, high_dy)
+
+    # Dentro do triângulo (1,1) a contribuição principal é a do vértice (1,1)
+    xsb = np.where(inside, xsb, xsb + 1)
+    ysb = np.where(inside, ysb, ysb + 1)
+    dx0 = np.where(inside, dx0, dx0 - 1 - 2 * SQUISH_CONSTANT2)
+    dy0 = np.where(inside, dy0, dy0 - 1 - 2 * SQUISH_CONSTANT2)
+
+    value += _contribution(perm, xsb, ysb, dx0, dy0)
+    value += _contribution(perm, xsv_ext, ysv_ext, dx_ext, dy_ext)
+
+    return value / NORM_CONSTANT2
+
+
+def noise2_grid(noise_gen, xs, ys):
+    # Amostra o ruído na grade xs × ys; retorna um array (len(ys), len(xs)),
+    # o mesmo formato de OpenSimplex.noise2array
+    x, y = np.meshgrid(np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64))
+    return noise2_points(noise_gen, x, y)
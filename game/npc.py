@@ -1,189 +1,348 @@
 import pygame
 import math
-import os
 import random
+import numpy as np
+from . import clock
+from .profiler import profiler
+from .assets import assets
+from .text import text_cache
 
-class NPC:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.initial_x = x  # Posição inicial X
-        self.initial_y = y  # Posição inicial Y
+INTERACTION_RADIUS = 100  # Raio de interação (balão de fala) em pixels
+
+# Direções guardadas como números (0 esquerda, 1 direita, 2 cima, 3 baixo)
+LEFT, RIGHT, UP, DOWN = range(4)
+DIRECTION_X = np.array([-1.0, 1.0, 0.0, 0.0])
+DIRECTION_Y = np.array([0.0, 0.0, -1.0, 1.0])
+OPPOSITE = np.array([RIGHT, LEFT, DOWN, UP], dtype=np.int8)
+
+# Estado de cada NPC, um array por campo (posição i = NPC i)
+FIELDS = (
+    ('x', np.float64),
+    ('y', np.float64),
+    ('prev_x', np.float64),  # Posição no passo anterior (para interpolar o desenho)
+    ('prev_y', np.float64),
+    ('initial_x', np.float64),  # Centro da área onde o NPC anda
+    ('initial_y', np.float64),
+    ('direction', np.int8),
+    ('moving', np.bool_),
+    ('facing_right', np.bool_),
+    ('movement_timer', np.float64),  # ms
+    ('pause_timer', np.float64),  # ms
+    ('health', np.int32),
+    ('damage_flash_timer', np.float64),  # ms
+    ('is_dead', np.bool_),
+    ('show_speech', np.bool_),
+    ('walk_frame', np.float64),
+    ('last_update', np.float64),  # Último avanço da animação (ms)
+)
+
+class NPCSystem:
+    # Todos os NPCs do jogo em arrays do numpy: a máquina de estados (andar e
+    # parar), o limite do raio de movimento e o teste de proximidade do jogador
+    # rodam para todos de uma vez em update(). Cada NPC é acessado por uma vista
+    # (NPC) que lê e escreve a sua posição nos arrays, usada para desenhar e
+    # para o dano das bolas de fogo.
+    def __init__(self, headless=False, capacity=64):
         self.width = 48
         self.height = 48
         self.hitbox_width = 64  # Hitbox maior que a imagem
         self.hitbox_height = 64  # Hitbox maior que a imagem
         self.speed = 2
         self.roam_radius = 100  # Raio máximo de movimento ao redor da posição inicial
-        
-        # Vida do NPC
-        self.health = 2
         self.max_health = 2
-        self.health_bar_width = 40
-        self.health_bar_height = 5
-        self.health_bar_offset = 10  # Distância da barra de vida em relação ao topo do NPC
-        
-        # Carrega a imagem do NPC
-        self.image = pygame.image.load(os.path.join('assets', 'images', 'npc.png')).convert_alpha()
-        self.image = pygame.transform.scale(self.image, (self.width, self.height))
-        self.image_left = self.image
-        self.image_right = pygame.transform.flip(self.image, True, False)
-        
-        # Estado do movimento
-        self.facing_right = True
-        self.movement_timer = 0
-        self.movement_duration = random.randint(60, 180)  # 1-3 segundos
-        self.pause_timer = 0
-        self.pause_duration = random.randint(60, 120)  # 1-2 segundos
-        self.moving = False
-        self.direction = random.choice(['left', 'right', 'up', 'down'])
-        
-        # Animação
-        self.walk_frame = 0
         self.walk_speed = 0.2
-        self.last_update = pygame.time.get_ticks()
-        
-        # Balão de fala
-        self.show_speech = False
-        self.speech_font = pygame.font.Font(None, 24)
-        self.speech_text = "OLÁ! SOU UM NPC!"
-        self.speech_color = (0, 0, 0)
-        self.speech_bg_color = (255, 255, 255)
-        self.speech_padding = 10
-        self.interaction_radius = 100  # Raio de interação em pixels
-        
-        # Estado de dano
-        self.damage_flash_timer = 0
-        self.damage_flash_duration = 10  # Frames que o flash de dano dura
-        self.is_dead = False
+        self.damage_flash_duration = 167  # Duração do flash de dano (ms)
+        self.interaction_radius = INTERACTION_RADIUS
 
-    def take_damage(self, amount=1):
-        if not self.is_dead:
-            self.health -= amount
-            self.damage_flash_timer = self.damage_flash_duration
-            if self.health <= 0:
-                self.health = 0
-                self.is_dead = True
-
-    def update(self, player_x, player_y):
-        if self.is_dead:
+        self.count = 0
+        self.views = []  # Vista de cada NPC, na mesma ordem dos arrays
+        for name, dtype in FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        # Sorteios de direção e duração; a seed vem do random global, então a
+        # mesma seed (ou um replay) repete os mesmos movimentos
+        self.rng = np.random.default_rng(random.getrandbits(64))
+
+        # Imagens carregadas uma vez e usadas por todos os NPCs
+        if not headless:
+            self.load_images()
+
+    def load_images(self):
+        size = (self.width, self.height)
+        self.image_left = assets.image('npc.png', size)
+        self.image_right = assets.image('npc.png', size, flip_x=True)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.views)
+
+    def __getitem__(self, index):
+        return self.views[index]
+
+    def grow(self):
+        capacity = max(64, len(self.x) * 2)
+        for name, dtype in FIELDS:
+            array = np.zeros(capacity, dtype=dtype)
+            array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+
+    def spawn(self, x, y):
+        if self.count == len(self.x):
+            self.grow()
+        i = self.count
+        self.x[i] = self.prev_x[i] = self.initial_x[i] = x
+        self.y[i] = self.prev_y[i] = self.initial_y[i] = y
+        self.direction[i] = LEFT
+        self.moving[i] = False
+        self.facing_right[i] = True
+        self.movement_timer[i] = 0
+        self.pause_timer[i] = 0
+        self.health[i] = self.max_health
+        self.damage_flash_timer[i] = 0
+        self.is_dead[i] = False
+        self.show_speech[i] = False
+        self.walk_frame[i] = 0
+        self.last_update[i] = clock.get_ticks()
+        self.count += 1
+        npc = NPC(self, i)
+        self.views.append(npc)
+        return npc
+
+    def take_damage(self, i, amount=1):
+        if not self.is_dead[i]:
+            self.health[i] -= amount
+            self.damage_flash_timer[i] = self.damage_flash_duration
+            if self.health[i] <= 0:
+                self.health[i] = 0
+                self.is_dead[i] = True
+
+    def remove_dead(self):
+        # Tira os NPCs mortos dos arrays (mantendo a ordem dos outros) e
+        # retorna quantos foram removidos
+        n = self.count
+        alive = ~self.is_dead[:n]
+        removed = n - int(alive.sum())
+        if removed:
+            for name, _ in FIELDS:
+                array = getattr(self, name)
+                array[:n - removed] = array[:n][alive]
+            self.views = [npc for npc, keep in zip(self.views, alive) if keep]
+            for i, npc in enumerate(self.views):
+                npc.index = i
+            self.count = n - removed
+        return removed
+
+    def save_positions(self):
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+
+    def update(self, dt=clock.FRAME_MS, player_x=None, player_y=None):
+        # Um passo de dt milissegundos para todos os NPCs vivos; os timers de
+        # movimento e pausa são em ms. Com a posição do jogador, liga o balão
+        # de fala dos NPCs a menos de interaction_radius dele
+        n = self.count
+        if not n:
             return
-            
-        # Atualiza o timer de flash de dano
-        if self.damage_flash_timer > 0:
-            self.damage_flash_timer -= 1
-            
-        # Verifica se o jogador está próximo
-        distance = math.sqrt((player_x - self.x) ** 2 + (player_y - self.y) ** 2)
-        self.show_speech = distance < self.interaction_radius
-        
-        # Atualiza a animação
-        now = pygame.time.get_ticks()
-        if now - self.last_update > 100:
-            self.walk_frame = (self.walk_frame + self.walk_speed) % 4
-            self.last_update = now
-            
-        if self.pause_timer > 0:
-            self.pause_timer -= 1
+        x, y = self.x[:n], self.y[:n]
+        alive = ~self.is_dead[:n]
+
+        # Balão de fala (pela posição antes de andar)
+        if player_x is not None:
+            distance_sq = (x - player_x) ** 2 + (y - player_y) ** 2
+            self.show_speech[:n] = alive & (distance_sq < self.interaction_radius ** 2)
+
+        # Timer de flash de dano
+        flash = self.damage_flash_timer[:n]
+        flash[alive & (flash > 0)] -= dt
+
+        # Animação
+        now = clock.get_ticks()
+        animate = alive & (now - self.last_update[:n] > 100)
+        self.walk_frame[:n][animate] = (self.walk_frame[:n][animate] + self.walk_speed) % 4
+        self.last_update[:n][animate] = now
+
+        # NPCs parados só descontam a pausa
+        pause = self.pause_timer[:n]
+        paused = alive & (pause > 0)
+        pause[paused] -= dt
+        active = alive & ~paused
+
+        # Fim do movimento: escolhe uma nova direção e duração
+        movement = self.movement_timer[:n]
+        moving = self.moving[:n]
+        direction = self.direction[:n]
+        start = active & (movement <= 0)
+        starting = int(start.sum())
+        if starting:
+            direction[start] = self.rng.integers(0, 4, starting)
+            movement[start] = self.rng.integers(1000, 3001, starting)
+            moving[start] = True
+        movement[active & ~start] -= dt
+
+        # Acabou o tempo andando: começa uma pausa
+        stop = active & (movement <= 0)
+        stopping = int(stop.sum())
+        if stopping:
+            pause[stop] = self.rng.integers(1000, 2001, stopping)
+            moving[stop] = False
+
+        walking = active & moving
+        if not walking.any():
             return
-            
-        if self.movement_timer <= 0:
-            # Escolhe uma nova direção e duração
-            self.direction = random.choice(['left', 'right', 'up', 'down'])
-            self.movement_timer = random.randint(60, 180)
-            self.moving = True
-        else:
-            self.movement_timer -= 1
-            
-        if self.movement_timer <= 0:
-            self.pause_timer = random.randint(60, 120)
-            self.moving = False
-            
-        if self.moving:
-            # Calcula a próxima posição
-            next_x = self.x
-            next_y = self.y
-            
-            if self.direction == 'left':
-                next_x -= self.speed
-                self.facing_right = False
-            elif self.direction == 'right':
-                next_x += self.speed
-                self.facing_right = True
-            elif self.direction == 'up':
-                next_y -= self.speed
-            elif self.direction == 'down':
-                next_y += self.speed
-                
-            # Verifica se a próxima posição está dentro do raio permitido
-            distance_from_start = math.sqrt(
-                (next_x - self.initial_x) ** 2 + 
-                (next_y - self.initial_y) ** 2
-            )
-            
-            if distance_from_start <= self.roam_radius:
-                self.x = next_x
-                self.y = next_y
-            else:
-                # Se estiver saindo do raio, inverte a direção
-                if self.direction == 'left':
-                    self.direction = 'right'
-                    self.facing_right = True
-                elif self.direction == 'right':
-                    self.direction = 'left'
-                    self.facing_right = False
-                elif self.direction == 'up':
-                    self.direction = 'down'
-                elif self.direction == 'down':
-                    self.direction = 'up'
+        step_x = DIRECTION_X[direction]
+        step_y = DIRECTION_Y[direction]
+        facing_right = self.facing_right[:n]
+        horizontal = walking & (step_x != 0)
+        facing_right[horizontal] = step_x[horizontal] > 0
+
+        # Só anda quem continua dentro do raio permitido; quem sairia inverte a direção
+        speed = self.speed * dt / clock.FRAME_MS
+        next_x = x + step_x * speed
+        next_y = y + step_y * speed
+        inside = ((next_x - self.initial_x[:n]) ** 2 +
+                  (next_y - self.initial_y[:n]) ** 2 <= self.roam_radius ** 2)
+        walk = walking & inside
+        x[walk] = next_x[walk]
+        y[walk] = next_y[walk]
+        turn = walking & ~inside
+        direction[turn] = OPPOSITE[direction[turn]]
+        facing_right[turn & horizontal] = direction[turn & horizontal] == RIGHT
+
+    def query_radius(self, x, y, radius):
+        # NPCs a uma distância menor que radius do ponto (x, y), na ordem dos arrays
+        n = self.count
+        distance_sq = (self.x[:n] - x) ** 2 + (self.y[:n] - y) ** 2
+        return [self.views[i] for i in np.flatnonzero(distance_sq < radius * radius)]
+
+    def visible(self, left, top, right, bottom):
+        # NPCs vivos com posição dentro do retângulo (para desenhar só o que aparece)
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        mask = ~self.is_dead[:n] & (x >= left) & (x <= right) & (y >= top) & (y <= bottom)
+        return [self.views[i] for i in np.flatnonzero(mask)]
+
+def array_field(name):
+    # Atributo de NPC guardado no array name do sistema
+    return property(lambda self: getattr(self.system, name)[self.index].item(),
+                    lambda self, value: getattr(self.system, name).__setitem__(self.index, value))
+
+class NPC:
+    # Vista de um NPC do NPCSystem: os atributos são lidos e escritos nos
+    # arrays do sistema, na posição index (atualizada quando NPCs são removidos)
+    speech_text = "OLÁ! SOU UM NPC!"
+    speech_color = (0, 0, 0)
+    speech_bg_color = (255, 255, 255)
+    speech_padding = 10
+    health_bar_width = 40
+    health_bar_height = 5
+    health_bar_offset = 10  # Distância da barra de vida em relação ao topo do NPC
+
+    def __init__(self, system, index):
+        self.system = system
+        self.index = index
+
+    x = array_field('x')
+    y = array_field('y')
+    prev_x = array_field('prev_x')
+    prev_y = array_field('prev_y')
+    initial_x = array_field('initial_x')
+    initial_y = array_field('initial_y')
+    moving = array_field('moving')
+    facing_right = array_field('facing_right')
+    health = array_field('health')
+    damage_flash_timer = array_field('damage_flash_timer')
+    is_dead = array_field('is_dead')
+    show_speech = array_field('show_speech')
+    walk_frame = array_field('walk_frame')
+
+    @property
+    def width(self):
+        return self.system.width
+
+    @property
+    def height(self):
+        return self.system.height
+
+    @property
+    def hitbox_width(self):
+        return self.system.hitbox_width
+
+    @property
+    def hitbox_height(self):
+        return self.system.hitbox_height
+
+    @property
+    def max_health(self):
+        return self.system.max_health
+
+    def take_damage(self, amount=1):
+        self.system.take_damage(self.index, amount)
+
+    def screen_rect(self, camera_x, camera_y):
+        # Área da tela que draw() pode ocupar (imagem com balanço, barra de vida e balão de fala)
+        screen_x = self.x - camera_x
+        screen_y = self.y - camera_y
+        rect = pygame.Rect(screen_x, screen_y - self.health_bar_offset - 2,
+                           self.width, self.height + self.health_bar_offset + 4)
+        if self.show_speech:
+            text_width, text_height = text_cache.render(self.speech_text, 24, self.speech_color).get_size()
+            rect.union_ip(pygame.Rect(screen_x - text_width/2 + self.width/2 - self.speech_padding - 2,
+                                      screen_y - text_height - 30 - self.speech_padding - 2,
+                                      text_width + 2 * self.speech_padding + 4,
+                                      text_height + 2 * self.speech_padding + 4))
+        return rect
 
     def draw(self, screen, camera_x, camera_y):
         if self.is_dead:
             return
-            
+
         # Calcula a posição na tela
         screen_x = self.x - camera_x
         screen_y = self.y - camera_y
-        
+
         # Só desenha se estiver visível na tela
         if (-self.width <= screen_x <= screen.get_width() + self.width and
             -self.height <= screen_y <= screen.get_height() + self.height):
-            
+            system = self.system
+
             # Escolhe a imagem baseada na direção
-            current_image = self.image_right if self.facing_right else self.image_left
-            
+            current_image = system.image_right if self.facing_right else system.image_left
+
             # Aplica um pequeno movimento de balanço ao andar
             offset_y = math.sin(self.walk_frame * math.pi) * 2 if self.moving else 0
-            
+
             # Desenha o NPC
             screen.blit(current_image, (screen_x, screen_y + offset_y))
-            
+            profiler.count('blits')
+
             # Desenha a barra de vida
             health_x = screen_x + (self.width - self.health_bar_width) / 2
             health_y = screen_y - self.health_bar_offset
-            
+
             # Fundo da barra de vida
-            pygame.draw.rect(screen, (255, 0, 0), 
+            pygame.draw.rect(screen, (255, 0, 0),
                            (health_x, health_y, self.health_bar_width, self.health_bar_height))
-            
+
             # Vida atual
             current_health_width = (self.health / self.max_health) * self.health_bar_width
-            pygame.draw.rect(screen, (0, 255, 0), 
+            pygame.draw.rect(screen, (0, 255, 0),
                            (health_x, health_y, current_health_width, self.health_bar_height))
-            
+
             # Efeito de dano (flash vermelho)
             if self.damage_flash_timer > 0:
                 flash_surface = pygame.Surface((self.width, self.height))
                 flash_surface.fill((255, 0, 0))
                 flash_surface.set_alpha(128)  # Semi-transparente
                 screen.blit(flash_surface, (screen_x, screen_y + offset_y))
-            
+
             # Desenha o balão de fala se necessário
             if self.show_speech:
                 # Renderiza o texto
-                text_surface = self.speech_font.render(self.speech_text, True, self.speech_color)
+                text_surface = text_cache.render(self.speech_text, 24, self.speech_color)
                 text_rect = text_surface.get_rect()
-                
+
                 # Cria o balão de fala
                 balloon_rect = pygame.Rect(
                     screen_x - text_rect.width/2 + self.width/2 - self.speech_padding,
@@ -191,11 +350,11 @@ class NPC:
                     text_rect.width + 2 * self.speech_padding,
                     text_rect.height + 2 * self.speech_padding
                 )
-                
+
                 # Desenha o balão de fala
                 pygame.draw.rect(screen, self.speech_bg_color, balloon_rect, border_radius=10)
                 pygame.draw.rect(screen, self.speech_color, balloon_rect, 2, border_radius=10)
-                
+
                 # Desenha o triângulo do balão
                 triangle_points = [
                     (screen_x + self.width/2, balloon_rect.bottom),
@@ -204,9 +363,9 @@ class NPC:
                 ]
                 pygame.draw.polygon(screen, self.speech_bg_color, triangle_points)
                 pygame.draw.polygon(screen, self.speech_color, triangle_points, 2)
-                
+
                 # Desenha o texto
                 screen.blit(text_surface, (
                     screen_x - text_rect.width/2 + self.width/2,
                     screen_y - text_rect.height - 30
-                )) 
\ No newline at end of file
+                ))
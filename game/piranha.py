@@ -1,56 +1,180 @@
 import random
-import pygame
-import os
 import math
+import numpy as np
+from . import clock
+from .npc import array_field
+from .profiler import profiler
+from .assets import assets
 
-class Piranha:
-    def __init__(self, x, y, game_map):
-        self.x = x
-        self.y = y
+# Estado de cada piranha, um array por campo (posição i = piranha i)
+FIELDS = (
+    ('x', np.float64),
+    ('y', np.float64),
+    ('prev_x', np.float64),  # Posição no passo anterior (para interpolar o desenho)
+    ('prev_y', np.float64),
+    ('direction', np.float64),  # Ângulo do movimento (radianos)
+)
+
+class PiranhaSwarm:
+    # Todas as piranhas em arrays do numpy, como o NPCSystem: o movimento, o
+    # teste de água (pela máscara de água em cache de cada chunk) e a distância
+    # até o jogador são calculados para todas de uma vez. Cada piranha é
+    # acessada por uma vista (Piranha) usada no desenho.
+    def __init__(self, game_map, headless=False, capacity=64):
+        self.game_map = game_map  # Referência para o mapa
         self.width = 32
         self.height = 32
         self.speed = 2
-        self.direction = random.uniform(0, 2 * math.pi)  # Direção aleatória
-        self.game_map = game_map  # Referência para o mapa
-        
-        # Carrega e ajusta a imagem da piranha
-        self.image = pygame.image.load(os.path.join('assets', 'images', 'piranha-fish.png')).convert_alpha()
-        self.image = pygame.transform.scale(self.image, (self.width, self.height))
-        self.original_image = self.image
-            
-    def is_in_water(self, x, y):
-        # Verifica se a posição está em água
-        return self.game_map.get_tile_at(x, y) == 'water'
-            
-    def update(self):
-        # Calcula a próxima posição
-        next_x = self.x + self.speed * math.cos(self.direction)
-        next_y = self.y + self.speed * math.sin(self.direction)
-        
-        # Só move se a próxima posição estiver na água
-        if self.is_in_water(next_x, next_y):
-            self.x = next_x
-            self.y = next_y
-        else:
-            # Se vai sair da água, muda a direção
-            self.direction = random.uniform(0, 2 * math.pi)
+        self.turn_chance = 0.01  # Chance de mudar de direção por passo de referência
+        self.rotation_steps = 64  # Direções desenhadas (imagens pré-giradas)
+
+        self.count = 0
+        self.views = []  # Vista de cada piranha, na mesma ordem dos arrays
+        for name, dtype in FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        # Seed derivada do random global, como no NPCSystem (replays determinísticos)
+        self.rng = np.random.default_rng(random.getrandbits(64))
+
+        # Sem tela (simulação headless) não há imagens
+        if not headless:
+            self.load_images()
+
+    def load_images(self):
+        # Imagens da piranha já giradas (as mesmas para todas)
+        self.rotations = assets.rotations('piranha-fish.png', (self.width, self.height), self.rotation_steps)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.views)
+
+    def __getitem__(self, index):
+        return self.views[index]
+
+    def grow(self):
+        capacity = max(64, len(self.x) * 2)
+        for name, dtype in FIELDS:
+            array = np.zeros(capacity, dtype=dtype)
+            array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+
+    def spawn(self, x, y):
+        if self.count == len(self.x):
+            self.grow()
+        i = self.count
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        self.direction[i] = self.rng.uniform(0, 2 * math.pi)  # Direção aleatória
+        self.count += 1
+        piranha = Piranha(self, i)
+        self.views.append(piranha)
+        return piranha
+
+    def remove(self, keep):
+        # Mantém só as piranhas com keep[i] verdadeiro (na mesma ordem);
+        # retorna quantas foram removidas
+        n = self.count
+        removed = n - int(keep.sum())
+        if removed:
+            for name, _ in FIELDS:
+                array = getattr(self, name)
+                array[:n - removed] = array[:n][keep]
+            self.views = [piranha for piranha, k in zip(self.views, keep) if k]
+            for i, piranha in enumerate(self.views):
+                piranha.index = i
+            self.count = n - removed
+        return removed
+
+    def save_positions(self):
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+
+    def update(self, dt=clock.FRAME_MS):
+        # Um passo para todas as piranhas. Uma só consulta ao mapa responde se a
+        # próxima posição de cada uma está na água (só então ela anda; senão
+        # muda de direção) e se a posição atual ainda é água: as que ficaram
+        # fora (o tile mudou) são removidas. Retorna quantas foram removidas
+        n = self.count
+        if not n:
+            return 0
+        x, y = self.x[:n], self.y[:n]
+        direction = self.direction[:n]
+        speed = self.speed * dt / clock.FRAME_MS
+        next_x = x + speed * np.cos(direction)
+        next_y = y + speed * np.sin(direction)
+
+        water = self.game_map.get_water_at(np.concatenate((next_x, x)),
+                                           np.concatenate((next_y, y)))
+        next_in_water, in_water = water[:n], water[n:]
+
+        x[next_in_water] = next_x[next_in_water]
+        y[next_in_water] = next_y[next_in_water]
+        # Muda de direção quem ia sair da água e, com menos frequência, ao acaso
+        turn = ~next_in_water | (self.rng.random(n) < self.turn_chance * dt / clock.FRAME_MS)
+        turning = int(turn.sum())
+        if turning:
+            direction[turn] = self.rng.uniform(0, 2 * math.pi, turning)
+
+        # Quem andou foi para a água; quem ficou parado precisa estar nela
+        return self.remove(next_in_water | in_water)
+
+    def count_near(self, x, y, radius):
+        # Quantas piranhas estão a uma distância menor que radius do ponto (x, y)
+        n = self.count
+        distance_sq = (self.x[:n] - x) ** 2 + (self.y[:n] - y) ** 2
+        return int(np.count_nonzero(distance_sq < radius * radius))
+
+    def draw(self, screen, camera_x, camera_y, alpha=1.0):
+        # Desenha as piranhas perto da tela com um só screen.blits: a posição
+        # interpolada (alpha: fração do passo atual, como no Game.draw) e a
+        # imagem pré-girada de cada uma são escolhidas para todas de uma vez.
+        # Retorna as áreas da tela desenhadas
+        n = self.count
+        prev_x, prev_y = self.prev_x[:n], self.prev_y[:n]
+        screen_x = prev_x + (self.x[:n] - prev_x) * alpha - camera_x
+        screen_y = prev_y + (self.y[:n] - prev_y) * alpha - camera_y
+        visible = np.flatnonzero((screen_x >= -self.width) & (screen_x <= screen.get_width() + self.width) &
+                                 (screen_y >= -self.height) & (screen_y <= screen.get_height() + self.height))
+        if not len(visible):
+            return []
         
-        # Muda de direção aleatoriamente com menos frequência
-        if random.random() < 0.01:  # 1% de chance por frame
-            self.direction = random.uniform(0, 2 * math.pi)
-            
-    def draw(self, screen, camera_x, camera_y):
-        # Calcula a posição na tela
-        screen_x = self.x - camera_x
-        screen_y = self.y - camera_y
+        # Imagem pré-girada mais próxima da direção do movimento (como Rotations.get)
+        rotations = self.rotations
+        angles = -np.degrees(self.direction[visible]) - 90
+        steps = np.rint(angles / rotations.step_angle).astype(np.int64) % rotations.steps
+        frames = rotations.frames
+        blits = []
+        for step, x, y in zip(steps.tolist(), screen_x[visible].tolist(), screen_y[visible].tolist()):
+            image, (offset_x, offset_y) = frames[step]
+            blits.append((image, (x + offset_x, y + offset_y)))
+        profiler.count('blits', len(blits))
+        return screen.blits(blits)
         
-        # Só desenha se estiver visível na tela
-        if (-self.width <= screen_x <= screen.get_width() + self.width and
-            -self.height <= screen_y <= screen.get_height() + self.height):
-            # Rotaciona a imagem na direção do movimento
-            angle = math.degrees(self.direction)
-            rotated_image = pygame.transform.rotate(self.original_image, -angle - 90)
-            screen.blit(rotated_image, (
-                screen_x - rotated_image.get_width()/2,
-                screen_y - rotated_image.get_height()/2
-            )) 
\ No newline at end of file
+    def visible(self, left, top, right, bottom):
+        # Piranhas com posição dentro do retângulo (para desenhar só o que aparece)
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        mask = (x >= left) & (x <= right) & (y >= top) & (y <= bottom)
+        return [self.views[i] for i in np.flatnonzero(mask)]
+
+class Piranha:
+    # Vista de uma piranha do PiranhaSwarm (atributos lidos dos arrays na posição index)
+    def __init__(self, system, index):
+        self.system = system
+        self.index = index
+
+    x = array_field('x')
+    y = array_field('y')
+    prev_x = array_field('prev_x')
+    prev_y = array_field('prev_y')
+    direction = array_field('direction')
+
+    @property
+    def width(self):
+        return self.system.width
+
+    @property
+    def height(self):
+        return self.system.height
@@ -1,12 +1,17 @@
 import pygame
 import math
-import os
+from . import clock
+from .profiler import profiler
+from .assets import assets
+from .text import text_cache
 from .items import ABILITIES
 
 class Player:
-    def __init__(self, x, y):
+    def __init__(self, x, y, headless=False):
         self.x = x
         self.y = y
+        self.prev_x = x  # Posição no passo anterior (para interpolar o desenho)
+        self.prev_y = y
         self.width = 40
         self.height = 60
         self.speed = 5
@@ -32,17 +37,14 @@ class Player:
             'teleport': ABILITIES['teleport']()
         }
         self.inventory = []
-        self.last_update = pygame.time.get_ticks()
+        self.last_update = clock.get_ticks()
         
         # Nome do jogador
         self.name = "Andre Pereira"
         
-        # Fonte para textos
-        self.font = pygame.font.Font(None, 24)
-        
         # Atributos básicos
         self.mana_regen = 1  # Mana regenerada por segundo
-        self.last_mana_regen = pygame.time.get_ticks()
+        self.last_mana_regen = clock.get_ticks()
         
         # Inventário e habilidades
         self.selected_ability = None
@@ -61,20 +63,26 @@ class Player:
         self.damage_cooldown = 1000  # 1 segundo
         self.water_effect_timer = 0
         self.water_effect_alpha = 0
+        self.water_damage_timer = 0  # Tempo na água desde o último dano (ms)
         
         # Configurações de pulo
         self.gravity = 0.5
         self.jump_power = 10
         self.max_fall_speed = 10
         
-        # Carregar imagem
-        self.image = pygame.image.load(os.path.join('assets', 'images', 'magic.png')).convert_alpha()
-        self.image = pygame.transform.scale(self.image, (self.width, self.height))
-        self.image_right = pygame.transform.flip(self.image, True, False)
-        self.image_left = self.image
-        
         # Cria o retângulo de colisão
         self.rect = pygame.Rect(int(self.x), int(self.y), self.width, self.height)
+        
+        # Sem tela (simulação headless) não há imagens
+        if not headless:
+            self.load_images()
+            
+    def load_images(self):
+        # Imagens (do cache compartilhado)
+        size = (self.width, self.height)
+        self.image = assets.image('magic.png', size)
+        self.image_right = assets.image('magic.png', size, flip_x=True)
+        self.image_left = self.image
 
     def add_item(self, item):
         self.inventory.append(item)
@@ -117,7 +125,7 @@ class Player:
         if not self.in_water:  # Só toma dano se estiver na água
             return
             
-        current_time = pygame.time.get_ticks()
+        current_time = clock.get_ticks()
         if current_time - self.last_damage_time >= self.damage_cooldown:
             self.health -= 1
             self.last_damage_time = current_time
@@ -129,7 +137,7 @@ class Player:
     def enter_castle(self):
         if not self.in_castle:
             self.in_castle = True
-            self.message_timer = 180  # 3 segundos a 60 FPS
+            self.message_timer = 3000  # 3 segundos
 
     def leave_castle(self):
         self.in_castle = False
@@ -138,6 +146,7 @@ class Player:
         if not self.in_water:
             self.in_water = True
             self.water_effect_timer = 0
+            self.water_damage_timer = 0
 
     def leave_water(self):
         if self.in_water:
@@ -145,36 +154,40 @@ class Player:
             self.water_effect_timer = 0
             self.damage_flash_timer = 0  # Reseta o timer de dano ao sair da água
 
-    def update(self):
+    def update(self, keys, dt=clock.FRAME_MS, game=None):
+        # Um passo de dt milissegundos (keys: InputState ou pygame.key.get_pressed());
+        # game é passado para as habilidades usadas pelos atalhos
+        frames = dt / clock.FRAME_MS
+        speed = self.speed * frames
+        
         # Movimento horizontal
-        keys = pygame.key.get_pressed()
         if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            self.x -= self.speed
+            self.x -= speed
             self.facing_right = False
         if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.x += self.speed
+            self.x += speed
             self.facing_right = True
         if keys[pygame.K_UP] or keys[pygame.K_w]:
-            self.y -= self.speed
+            self.y -= speed
         if keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            self.y += self.speed
+            self.y += speed
             
         # Atualiza os timers
-        current_time = pygame.time.get_ticks()
+        current_time = clock.get_ticks()
         if self.damage_flash_timer > 0:
-            self.damage_flash_timer = max(0, self.damage_flash_timer - (current_time - self.last_update))
+            self.damage_flash_timer = max(0, self.damage_flash_timer - dt)
         if self.invincible_timer > 0:
-            self.invincible_timer = max(0, self.invincible_timer - (current_time - self.last_update))
+            self.invincible_timer = max(0, self.invincible_timer - dt)
         if self.message_timer > 0:
-            self.message_timer = max(0, self.message_timer - (current_time - self.last_update))
+            self.message_timer = max(0, self.message_timer - dt)
             
         self.last_update = current_time
         
         # Uso de habilidades
         if keys[pygame.K_q]:  # Bola de Fogo
-            self.abilities['fireball'].use(self, None)
+            self.abilities['fireball'].use(self, game)
         elif keys[pygame.K_e]:  # Teleporte
-            self.abilities['teleport'].use(self, None)
+            self.abilities['teleport'].use(self, game)
         
         # Atualiza regeneração de mana
         if current_time - self.last_mana_regen >= 1000:  # A cada segundo
@@ -187,17 +200,29 @@ class Player:
             
         # Atualiza o efeito de água
         if self.in_water:
-            self.water_effect_alpha = min(self.water_effect_alpha + 5, 128)
-            # Aplica dano a cada 60 frames (1 segundo) se estiver na água
-            if pygame.time.get_ticks() % 60 == 0:
+            self.water_effect_alpha = min(self.water_effect_alpha + 5 * frames, 128)
+            # Aplica dano a cada segundo se estiver na água
+            self.water_damage_timer += dt
+            if self.water_damage_timer >= 1000:
+                self.water_damage_timer -= 1000
                 self.take_damage()
         else:
-            self.water_effect_alpha = max(self.water_effect_alpha - 5, 0)
+            self.water_effect_alpha = max(self.water_effect_alpha - 5 * frames, 0)
             
         # Atualiza o retângulo de colisão
         self.rect.x = self.x
         self.rect.y = self.y
 
+    def screen_rect(self, camera_x, camera_y):
+        # Área da tela que draw() pode ocupar (imagem, barra de vida e nome)
+        screen_x = self.x - camera_x
+        screen_y = self.y - camera_y
+        rect = pygame.Rect(screen_x - self.width/2, screen_y - self.height/2 - 10,
+                           self.width, self.height + 10)
+        name_text = text_cache.render(self.name, 24, (255, 255, 255))
+        rect.union_ip(name_text.get_rect(center=(screen_x + self.width/2, screen_y - 20)).inflate(20, 10))
+        return rect.inflate(2, 2)
+
     def draw(self, screen, camera_x, camera_y):
         # Calcula a posição na tela
         screen_x = self.x - camera_x
@@ -206,6 +231,7 @@ class Player:
         # Desenha o jogador
         current_image = self.image_right if self.facing_right else self.image_left
         screen.blit(current_image, (screen_x - self.width/2, screen_y - self.height/2))
+        profiler.count('blits')
         
         # Desenha a barra de vida
         health_width = 40
@@ -227,7 +253,7 @@ class Player:
             screen.blit(flash_surface, (screen_x - self.width/2, screen_y - self.height/2))
         
         # Desenha o nome do jogador acima do personagem
-        name_text = self.font.render(self.name, True, (255, 255, 255))
+        name_text = text_cache.render(self.name, 24, (255, 255, 255))
         name_rect = name_text.get_rect(center=(screen_x + self.width/2, screen_y - 20))
         # Adiciona um fundo escuro semi-transparente para melhor legibilidade
         bg_rect = name_rect.inflate(20, 10)
@@ -239,22 +265,6 @@ class Player:
         # Efeito de água
         if self.in_water:
             water_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-            alpha = int(128 + math.sin(pygame.time.get_ticks() * 0.01) * 64)  # Varia entre 64 e 192
+            alpha = int(128 + math.sin(clock.get_ticks() * 0.01) * 64)  # Varia entre 64 e 192
             water_surface.fill((0, 0, 255, alpha))  # Azul com transparência variável
             screen.blit(water_surface, (screen_x - self.width/2, screen_y - self.height/2))
-            
-        # Mensagem do castelo
-        if self.in_castle and self.message_timer > 0:
-            text = self.font.render("Bem-vindo ao Castelo!", True, (255, 255, 255))
-            text_rect = text.get_rect(center=(screen.get_width()/2, 50))
-            screen.blit(text, text_rect)
-            
-        # Desenha as instruções das teclas
-        instructions = [
-            "Setas: Mover",
-            "ESC: Sair",
-            f"Vida: {self.health}/{self.max_health}"
-        ]
-        for i, text in enumerate(instructions):
-            text_surface = self.font.render(text, True, (255, 255, 255))
-            screen.blit(text_surface, (10, 10 + i * 30)) 
\ No newline at end of file
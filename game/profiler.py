@@ -0,0 +1,171 @@
+import array
+import csv
+import json
+import os
+import time
+from collections import deque
+import pygame
+from .text import text_cache
+
+class Section:
+    # Mede o tempo de um trecho: with profiler.section('npcs'): ...
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, (time.perf_counter() - self.start) * 1000)
+
+class Profiler:
+    # Tempos por frame de cada fase do jogo (em ms) e contadores por frame.
+    # Guarda uma janela recente para min/média/p95/p99 (mostrados no overlay)
+    # e o histórico de frames para exportar em CSV/JSON.
+    def __init__(self, history=300, max_trace=36000):
+        self.names = []  # Seções e contadores, na ordem em que aparecem
+        self.index = {}  # Nome -> posição em names
+        self.sections = {}  # Objetos Section reaproveitados, por nome
+        self.watches = {}  # Nome -> função que retorna um total acumulado
+        self.watch_totals = {}  # Último total lido de cada função
+        self.frame = []  # Valores do frame atual
+        self.frame_start = None
+        self.frame_number = 0
+        self.recent = {}  # Nome -> últimos valores (janela de history frames)
+        self.history = history
+        self.trace = deque(maxlen=max_trace)  # (número do frame, valores) por frame
+
+        # Overlay na tela (ligado/desligado com uma tecla)
+        self.overlay_visible = False
+        self.overlay = None
+        self.overlay_updated = 0.0
+        self.font = None
+        
+        self.slot('total')  # Tempo total do frame, sempre a primeira coluna
+
+    def slot(self, name):
+        i = self.index.get(name)
+        if i is None:
+            i = self.index[name] = len(self.names)
+            self.names.append(name)
+            self.frame.append(0.0)
+            self.recent[name] = deque(maxlen=self.history)
+        return i
+
+    def section(self, name):
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = Section(self, name)
+        return section
+
+    def add(self, name, value):
+        self.frame[self.slot(name)] += value
+
+    def count(self, name, amount=1):
+        self.frame[self.slot(name)] += amount
+
+    def watch(self, name, total):
+        # Contador lido de outro objeto: total() retorna um valor acumulado
+        # (ex.: GameMap.tile_lookups) e cada frame registra quanto ele cresceu.
+        # Bom para caminhos muito usados, que só incrementam um atributo.
+        self.watches[name] = total
+        self.watch_totals[name] = total()
+        self.slot(name)
+
+    def begin_frame(self):
+        self.frame = [0.0] * len(self.names)
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        self.add('total', (time.perf_counter() - self.frame_start) * 1000)
+        for name, total in self.watches.items():
+            value = total()
+            self.add(name, value - self.watch_totals[name])
+            self.watch_totals[name] = value
+        for name, value in zip(self.names, self.frame):
+            self.recent[name].append(value)
+        self.trace.append((self.frame_number, array.array('d', self.frame)))
+        self.frame_number += 1
+        self.frame_start = None
+
+    def stats(self, values):
+        if not values:
+            return {'min': 0.0, 'avg': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+        ordered = sorted(values)
+        last = len(ordered) - 1
+        return {
+            'min': ordered[0],
+            'avg': sum(ordered) / len(ordered),
+            'p95': ordered[round(last * 0.95)],
+            'p99': ordered[round(last * 0.99)],
+            'max': ordered[-1],
+        }
+
+    def summary(self, recent=True):
+        # Estatísticas de cada seção/contador: da janela recente ou de todo o histórico
+        result = {}
+        for i, name in enumerate(self.names):
+            if recent:
+                values = self.recent[name]
+            else:
+                values = [row[i] for _, row in self.trace if i < len(row)]
+            result[name] = self.stats(values)
+        return result
+
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+        self.overlay = None
+
+    def draw(self, screen):
+        # Retorna a área da tela ocupada pelo overlay (None se estiver desligado)
+        if not self.overlay_visible:
+            return None
+        # O texto é refeito duas vezes por segundo, não a cada frame
+        now = time.perf_counter()
+        if self.overlay is None or now - self.overlay_updated > 0.5:
+            self.overlay = self.render_overlay()
+            self.overlay_updated = now
+        return screen.blit(self.overlay, (screen.get_width() - self.overlay.get_width() - 10,
+                                          screen.get_height() - self.overlay.get_height() - 10))
+
+    def render_overlay(self):
+        if self.font is None:
+            self.font = text_cache.font(20)  # As linhas mudam sempre: sem o cache de textos
+        lines = [f"{'':14}{'min':>7}{'méd':>7}{'p95':>7}{'p99':>7}"]
+        for name, stats in self.summary().items():
+            lines.append(f"{name:14}{stats['min']:7.2f}{stats['avg']:7.2f}"
+                         f"{stats['p95']:7.2f}{stats['p99']:7.2f}")
+        surfaces = [self.font.render(line, True, (255, 255, 255)) for line in lines]
+        width = max(surface.get_width() for surface in surfaces) + 10
+        height = sum(surface.get_height() for surface in surfaces) + 10
+        overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 180))
+        y = 5
+        for surface in surfaces:
+            overlay.blit(surface, (5, y))
+            y += surface.get_height()
+        return overlay
+
+    def export(self, path):
+        # Grava path.csv (um frame por linha) e path.json (resumo + frames)
+        if not self.trace:
+            return
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        columns = len(self.names)
+        rows = [[number] + list(values) + [0.0] * (columns - len(values))
+                for number, values in self.trace]
+        with open(path + '.csv', 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame'] + self.names)
+            writer.writerows(rows)
+        with open(path + '.json', 'w') as f:
+            json.dump({'columns': ['frame'] + self.names,
+                       'summary': self.summary(recent=False),
+                       'frames': rows}, f)
+
+# Profiler único do jogo (como pygame.time, um só para todos os módulos)
+profiler = Profiler()
@@ -0,0 +1,210 @@
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import zlib
+import numpy as np
+
+# Formato de um arquivo de região (regions/r.<rx>.<ry>.dat), com N×N chunks:
+#   cabeçalho: assinatura, versão, N, largura e altura do chunk em tiles
+#   índice:    N×N entradas (offset, tamanho) dos dados de cada chunk; tamanho 0 = ausente
+#   dados:     IDs dos tiles de cada chunk comprimidos com zlib, adicionados no fim do arquivo
+# Um chunk regravado é adicionado de novo no fim e o índice passa a apontar para ele;
+# os dados antigos ficam no arquivo sem uso. Só chunks alterados (castelos, tiles
+# mudados) são regravados, então o espaço perdido cresce com as alterações, não
+# com a exploração: um chunk ainda na fila de gravação não é gravado de novo
+# (load o encontra na fila, então o GameMap não o gera nem grava outra vez).
+REGION_MAGIC = b'DNDR'
+REGION_VERSION = 1
+HEADER = struct.Struct('<4sHHHH')
+INDEX_ENTRY = struct.Struct('<II')
+
+class RegionStore:
+    def __init__(self, path, seed=None, chunk_size=12, region_size=16):
+        # Abre (ou cria) um mundo salvo em disco; o seed gravado em world.json
+        # tem prioridade sobre o seed passado
+        self.path = path
+        self.regions_path = os.path.join(path, 'regions')
+        os.makedirs(self.regions_path, exist_ok=True)
+
+        info_path = os.path.join(path, 'world.json')
+        if os.path.exists(info_path):
+            with open(info_path) as f:
+                info = json.load(f)
+            if info['chunk_size'] != chunk_size:
+                raise ValueError(f"Mundo em {path} usa chunks de {info['chunk_size']} tiles, não {chunk_size}")
+        else:
+            if seed is None:
+                raise ValueError(f"Mundo novo em {path} precisa de um seed")
+            info = {'version': REGION_VERSION, 'seed': seed,
+                    'chunk_size': chunk_size, 'region_size': region_size}
+            with open(info_path, 'w') as f:
+                json.dump(info, f, indent=2)
+        self.seed = info['seed']
+        self.chunk_size = info['chunk_size']
+        self.region_size = info['region_size']
+
+        # self.lock protege os índices e os mmaps (trechos curtos, sem gravar em
+        # disco); write_lock é o da gravação, para uma leitura nunca esperar por ela
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.indexes = {}  # Índice (offset, tamanho) de cada região em memória (None = arquivo não existe)
+        self.maps = {}  # Arquivos de região mapeados em memória
+        self.queued = {}  # (chunk_x, chunk_y) -> tiles na fila de gravação (a versão mais nova)
+        self.error = None  # Primeiro erro da thread de gravação (relançado por flush/close)
+
+        # Gravação assíncrona numa thread própria
+        self.write_queue = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, name='region-writer', daemon=True)
+        self.writer.start()
+
+    def region_file(self, region_x, region_y):
+        return os.path.join(self.regions_path, f'r.{region_x}.{region_y}.dat')
+
+    def locate(self, chunk_x, chunk_y):
+        region_x = chunk_x // self.region_size
+        region_y = chunk_y // self.region_size
+        index = (chunk_y - region_y * self.region_size) * self.region_size + chunk_x - region_x * self.region_size
+        return region_x, region_y, index
+
+    def get_index(self, region_x, region_y):
+        # Retorna o índice da região (array N×N × (offset, tamanho)), lido do
+        # arquivo na primeira consulta e depois mantido em dia por save; None
+        # se o arquivo não existe. Precisa do lock
+        key = (region_x, region_y)
+        if key not in self.indexes:
+            path = self.region_file(region_x, region_y)
+            if os.path.exists(path):
+                index_size = INDEX_ENTRY.size * self.region_size * self.region_size
+                with open(path, 'rb') as f:
+                    data = f.read(HEADER.size + index_size)
+                magic, version, region_size, width, height = HEADER.unpack_from(data)
+                if (magic != REGION_MAGIC or version != REGION_VERSION or region_size != self.region_size or
+                        len(data) != HEADER.size + index_size):
+                    raise ValueError(f"Arquivo de região inválido: {path}")
+                index = np.frombuffer(data, dtype='<u4', offset=HEADER.size).reshape(-1, 2).copy()
+                self.indexes[key] = index
+            else:
+                self.indexes[key] = None
+        return self.indexes[key]
+
+    def get_map(self, region_x, region_y, end):
+        # Retorna o mmap da região com pelo menos end bytes: o arquivo só é
+        # mapeado de novo quando a leitura passa do fim do mapa atual (chunk
+        # gravado depois do mapeamento). Precisa do lock
+        key = (region_x, region_y)
+        region_map = self.maps.get(key)
+        if region_map is None or len(region_map) < end:
+            self.close_map(region_x, region_y)
+            with open(self.region_file(region_x, region_y), 'rb') as f:
+                region_map = self.maps[key] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return region_map
+
+    def close_map(self, region_x, region_y):
+        region_map = self.maps.pop((region_x, region_y), None)
+        if region_map is not None:
+            region_map.close()
+
+    def load(self, chunk_x, chunk_y):
+        # Retorna os IDs dos tiles do chunk (array height × width) ou None se não estiver salvo
+        # Chunks ausentes são respondidos pelo índice em memória, sem ler o disco
+        region_x, region_y, index = self.locate(chunk_x, chunk_y)
+        with self.lock:
+            # Gravado há pouco e ainda na fila: os tiles ainda estão em memória
+            tiles = self.queued.get((chunk_x, chunk_y))
+            if tiles is not None:
+                return tiles
+            region_index = self.get_index(region_x, region_y)
+            if region_index is None:
+                return None
+            offset, length = (int(value) for value in region_index[index])
+            if length == 0:
+                return None
+            region_map = self.get_map(region_x, region_y, offset + length)
+            data = region_map[offset:offset + length]
+        tiles = np.frombuffer(zlib.decompress(data), dtype=np.uint8)
+        return tiles.reshape(self.chunk_size, self.chunk_size)
+
+    def contains(self, chunk_x, chunk_y):
+        # O chunk está salvo? Consulta só o índice, sem ler nem descomprimir os dados
+        region_x, region_y, index = self.locate(chunk_x, chunk_y)
+        with self.lock:
+            if (chunk_x, chunk_y) in self.queued:
+                return True
+            region_index = self.get_index(region_x, region_y)
+            return region_index is not None and region_index[index][1] != 0
+
+    def save(self, chunk_x, chunk_y, tile_ids):
+        data = zlib.compress(np.ascontiguousarray(tile_ids, dtype=np.uint8).tobytes())
+        region_x, region_y, index = self.locate(chunk_x, chunk_y)
+        path = self.region_file(region_x, region_y)
+        with self.write_lock:
+            with self.lock:
+                # Arquivo novo: criado junto com o índice em memória (uma vez por região)
+                if self.get_index(region_x, region_y) is None:
+                    with open(path, 'wb') as f:
+                        f.write(HEADER.pack(REGION_MAGIC, REGION_VERSION, self.region_size,
+                                            self.chunk_size, self.chunk_size))
+                        f.write(bytes(INDEX_ENTRY.size * self.region_size * self.region_size))
+                    self.indexes[(region_x, region_y)] = np.zeros((self.region_size * self.region_size, 2),
+                                                                  dtype='<u4')
+            # Os dados vão para o fim do arquivo sem segurar o lock das leituras;
+            # o mmap aberto continua válido para os chunks gravados antes
+            with open(path, 'r+b') as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(data)
+                f.seek(HEADER.size + index * INDEX_ENTRY.size)
+                f.write(INDEX_ENTRY.pack(offset, len(data)))
+            # Só agora (dados no arquivo) o chunk aparece no índice
+            with self.lock:
+                self.indexes[(region_x, region_y)][index] = (offset, len(data))
+
+    def save_async(self, chunk_x, chunk_y, tile_ids):
+        # Enfileira a gravação; os tiles são copiados para não mudarem antes de gravar
+        tiles = np.array(tile_ids, dtype=np.uint8)
+        with self.lock:
+            self.queued[(chunk_x, chunk_y)] = tiles
+        self.write_queue.put((chunk_x, chunk_y, tiles))
+
+    def write_loop(self):
+        # Um erro numa gravação (disco cheio, permissão) não para a thread: é
+        # guardado e relançado por flush/close, e as próximas gravações continuam
+        while True:
+            job = self.write_queue.get()
+            try:
+                if job is None:
+                    return
+                chunk_x, chunk_y, tiles = job
+                try:
+                    self.save(chunk_x, chunk_y, tiles)
+                except Exception as error:
+                    if self.error is None:
+                        self.error = error
+                with self.lock:
+                    if self.queued.get((chunk_x, chunk_y)) is tiles:
+                        del self.queued[(chunk_x, chunk_y)]
+            finally:
+                self.write_queue.task_done()
+
+    def raise_error(self):
+        error, self.error = self.error, None
+        if error is not None:
+            raise OSError(f"Falha ao gravar chunks em {self.path}") from error
+
+    def flush(self):
+        # Espera todas as gravações pendentes terminarem
+        self.write_queue.join()
+        self.raise_error()
+
+    def close(self):
+        if self.writer is not None:
+            self.write_queue.put(None)
+            self.writer.join()
+            self.writer = None
+        with self.lock:
+            for key in list(self.maps):
+                self.close_map(*key)
+            self.indexes.clear()
+        self.raise_error()
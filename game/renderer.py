@@ -0,0 +1,88 @@
+import pygame
+from .hud import merge_rects
+from .profiler import profiler
+
+class DirtyRectRenderer:
+    # Envia cada frame desenhado para o display. No modo normal é um
+    # display.flip() por frame; com dirty_rects=True só as áreas que mudaram
+    # (entidades que se moveram, widgets do HUD, overlay do profiler) vão para
+    # o display com display.update(rects), e a tela inteira só quando a câmera
+    # se move ou o mapa muda. Telas paradas (menu, pausa, inventário) são
+    # desenhadas uma vez e guardadas nos dois modos.
+    def __init__(self, screen, dirty_rects=False):
+        self.screen = screen
+        self.dirty_rects = dirty_rects
+        self.full_update = True  # O próximo present envia a tela inteira
+        self.rects = []  # Áreas alteradas neste frame
+        self.entity_rects = []  # Áreas das entidades no frame anterior (a apagar)
+        self.camera = None  # Câmera do último frame do jogo
+        self.static_key = None  # Tela parada mostrada agora
+        self.static_frame = None  # Cópia da tela parada (para restaurar o que for desenhado por cima)
+        self.overlay_rect = None  # Área do overlay do profiler no último frame
+
+        # Estatísticas
+        self.frames = 0
+        self.full_frames = 0
+        self.pixels_sent = 0
+
+    def invalidate(self):
+        self.full_update = True
+
+    def add(self, rects):
+        self.rects.extend(rect for rect in rects if rect is not None)
+
+    def show_static(self, key, draw):
+        # Tela parada identificada por key: draw(screen) só roda quando a tela
+        # muda; nos outros frames nada é redesenhado nem enviado
+        if key != self.static_key:
+            draw(self.screen)
+            self.static_key = key
+            self.static_frame = self.screen.copy()
+            self.entity_rects = []
+            self.camera = None
+            self.invalidate()
+        elif self.overlay_rect is not None:
+            # Apaga o overlay do profiler desenhado no frame anterior
+            self.screen.blit(self.static_frame, self.overlay_rect, self.overlay_rect)
+            self.rects.append(self.overlay_rect)
+
+    def begin_scene(self, camera_x, camera_y):
+        # Frame do jogo: com a câmera parada (em pixels) só as áreas marcadas mudam
+        self.static_key = None
+        camera = (round(camera_x), round(camera_y))
+        if camera != self.camera:
+            self.camera = camera
+            self.invalidate()
+
+    def track_entities(self, rects):
+        # Áreas das entidades desenhadas neste frame: mudam elas e as do frame anterior
+        rects = [rect for rect in rects if rect is not None]
+        self.rects.extend(self.entity_rects)
+        self.rects.extend(rects)
+        self.entity_rects = rects
+
+    def draw_overlay(self):
+        # Overlay do profiler (F3) por cima de tudo. A área do overlay anterior
+        # também é enviada: ele pode ter mudado de tamanho ou sido desligado
+        rect = profiler.draw(self.screen)
+        self.add((self.overlay_rect, rect))
+        self.overlay_rect = rect
+
+    def present(self):
+        self.frames += 1
+        screen_rect = self.screen.get_rect()
+        if not self.dirty_rects:
+            pygame.display.flip()
+            self.full_frames += 1
+            self.pixels_sent += screen_rect.width * screen_rect.height
+        elif self.full_update:
+            pygame.display.update()
+            self.full_frames += 1
+            self.pixels_sent += screen_rect.width * screen_rect.height
+        elif self.rects:
+            rects = merge_rects([rect.clip(screen_rect) for rect in self.rects])
+            rects = [rect for rect in rects if rect.width and rect.height]
+            pygame.display.update(rects)
+            self.pixels_sent += sum(rect.width * rect.height for rect in rects)
+        self.rects = []
+        self.full_update = False
@@ -0,0 +1,66 @@
+import struct
+import zlib
+from .input import InputState, TRACKED_KEYS
+
+# Arquivo de replay: tudo o que a simulação consome, passo a passo.
+#   cabeçalho: assinatura, versão, seed do mundo, seed do random, duração do passo (ms), passos
+#   passos (comprimidos com zlib): máscara das teclas seguradas (bits na ordem de
+#   TRACKED_KEYS), número de teclas apertadas e os códigos delas
+REPLAY_MAGIC = b'DNDP'
+REPLAY_VERSION = 1
+HEADER = struct.Struct('<4sHIIdI')
+STEP = struct.Struct('<HB')
+KEY = struct.Struct('<I')
+
+class Replay:
+    def __init__(self, world_seed, spawn_seed, tick_ms, steps=None):
+        # world_seed: seed do GameMap; spawn_seed: seed do random global
+        # (spawns, NPCs, piranhas), aplicado antes de criar o Game
+        self.world_seed = world_seed
+        self.spawn_seed = spawn_seed
+        self.tick_ms = tick_ms
+        self.steps = steps if steps is not None else []  # (máscara, teclas apertadas) por passo
+
+    def record(self, inputs):
+        # Chamado pelo Game a cada passo com a entrada consumida
+        mask = 0
+        for bit, key in enumerate(TRACKED_KEYS):
+            if inputs[key]:
+                mask |= 1 << bit
+        self.steps.append((mask, tuple(inputs.pressed)))
+
+    def inputs(self):
+        # Reproduz a entrada de cada passo, na ordem
+        for mask, pressed in self.steps:
+            held = [key for bit, key in enumerate(TRACKED_KEYS) if mask & (1 << bit)]
+            yield InputState(held, pressed)
+
+    def save(self, path):
+        data = bytearray()
+        for mask, pressed in self.steps:
+            data += STEP.pack(mask, len(pressed))
+            for key in pressed:
+                data += KEY.pack(key)
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.world_seed,
+                                self.spawn_seed, self.tick_ms, len(self.steps)))
+            f.write(zlib.compress(bytes(data), 9))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+            data = zlib.decompress(f.read())
+        magic, version, world_seed, spawn_seed, tick_ms, count = HEADER.unpack(header)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"Arquivo de replay inválido: {path}")
+        steps = []
+        offset = 0
+        for _ in range(count):
+            mask, pressed_count = STEP.unpack_from(data, offset)
+            offset += STEP.size
+            pressed = tuple(KEY.unpack_from(data, offset + i * KEY.size)[0]
+                            for i in range(pressed_count))
+            offset += pressed_count * KEY.size
+            steps.append((mask, pressed))
+        return cls(world_seed, spawn_seed, tick_ms, steps)
@@ -0,0 +1,68 @@
+import math
+
+class SpatialHash:
+    # Índice espacial em grade uniforme: cada entidade (qualquer objeto com x e
+    # y) fica na célula da sua posição, e as consultas só olham as células que
+    # cobrem a área pedida em vez da lista inteira. As células guardam as
+    # entidades em ordem de inserção (dict), então os resultados das consultas
+    # são sempre os mesmos para a mesma sequência de operações.
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.cells = {}  # (célula x, célula y) -> {entidade: None}
+        self.entity_cells = {}  # Entidade -> célula onde está registrada
+
+    def __len__(self):
+        return len(self.entity_cells)
+
+    def __contains__(self, entity):
+        return entity in self.entity_cells
+
+    def cell_of(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, entity):
+        key = self.cell_of(entity.x, entity.y)
+        self.entity_cells[entity] = key
+        self.cells.setdefault(key, {})[entity] = None
+
+    def remove(self, entity):
+        key = self.entity_cells.pop(entity, None)
+        if key is not None:
+            cell = self.cells[key]
+            del cell[entity]
+            if not cell:
+                del self.cells[key]
+
+    def move(self, entity):
+        # Atualiza a célula depois que a entidade se moveu (barato se não mudou de célula)
+        key = self.cell_of(entity.x, entity.y)
+        old_key = self.entity_cells.get(entity)
+        if key == old_key:
+            return
+        if old_key is not None:
+            self.remove(entity)
+        self.entity_cells[entity] = key
+        self.cells.setdefault(key, {})[entity] = None
+
+    def clear(self):
+        self.cells.clear()
+        self.entity_cells.clear()
+
+    def query_rect(self, left, top, right, bottom):
+        # Entidades com posição dentro do retângulo (bordas inclusas)
+        start_x, start_y = self.cell_of(left, top)
+        end_x, end_y = self.cell_of(right, bottom)
+        result = []
+        for cell_y in range(start_y, end_y + 1):
+            for cell_x in range(start_x, end_x + 1):
+                cell = self.cells.get((cell_x, cell_y))
+                if cell:
+                    result.extend(entity for entity in cell
+                                  if left <= entity.x <= right and top <= entity.y <= bottom)
+        return result
+
+    def query_radius(self, x, y, radius):
+        # Entidades a uma distância menor que radius do ponto (x, y)
+        radius_sq = radius * radius
+        return [entity for entity in self.query_rect(x - radius, y - radius, x + radius, y + radius)
+                if (entity.x - x) ** 2 + (entity.y - y) ** 2 < radius_sq]
@@ -0,0 +1,56 @@
+from collections import OrderedDict
+import pygame
+
+class TextCache:
+    # Fontes compartilhadas e cache LRU de textos já renderizados. Textos fixos
+    # ou que mudam pouco (instruções, nível, objetivo) são rasterizados uma vez
+    # e depois só copiados para a tela. As Surfaces retornadas são
+    # compartilhadas e não devem ser alteradas
+    def __init__(self, max_surfaces=256):
+        self.fonts = {}  # (arquivo da fonte, tamanho) -> Font
+        self.surfaces = OrderedDict()  # (fonte, tamanho, texto, cor, antialias) -> Surface
+        self.max_surfaces = max_surfaces
+
+        # Estatísticas
+        self.hits = 0
+        self.misses = 0  # Textos renderizados (rasterizados pela fonte)
+        self.evictions = 0
+
+    def font(self, size, name=None):
+        # Fonte compartilhada (name=None é a fonte padrão do pygame)
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pygame.font.Font(name, size)
+        return font
+
+    def render(self, text, size, color, name=None, antialias=True):
+        key = (name, size, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self.surfaces[key] = self.font(size, name).render(text, antialias, color)
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)  # Remove o usado há mais tempo
+            self.evictions += 1
+        return surface
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'fonts': len(self.fonts),
+            'surfaces': len(self.surfaces),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        self.surfaces.clear()
+
+# Cache único do jogo (como o profiler e o cache de imagens)
+text_cache = TextCache()
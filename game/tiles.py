@@ -0,0 +1,42 @@
+import numpy as np
+
+# Propriedades dos tiles, combinadas em uma máscara de bits
+WALKABLE = 1   # Pode ser percorrido a pé
+SWIMMABLE = 2  # Água: piranhas nadam e o jogador entra na água
+DAMAGING = 4   # Causa dano ao jogador
+SHELTER = 8    # Abrigo (castelo)
+
+class TileType:
+    def __init__(self, tile_id, name, color, flags):
+        self.id = tile_id
+        self.name = name
+        self.color = color  # Cor base da textura (ver GameMap.load_images)
+        self.flags = flags
+
+    def has(self, flag):
+        return bool(self.flags & flag)
+
+# Registro de todos os tipos de tile; o índice na lista é o ID guardado nos chunks
+TILE_TYPES = [
+    TileType(0, 'water', (0, 0, 139), SWIMMABLE | DAMAGING),
+    TileType(1, 'grass', (34, 139, 34), WALKABLE),
+    TileType(2, 'forest', (0, 100, 0), WALKABLE),
+    TileType(3, 'path', (210, 180, 140), WALKABLE),
+    TileType(4, 'castle', (169, 169, 169), WALKABLE | SHELTER),
+]
+
+TILE_IDS = {tile.name: tile.id for tile in TILE_TYPES}
+TILE_NAMES = [tile.name for tile in TILE_TYPES]
+TILE_FLAGS = np.array([tile.flags for tile in TILE_TYPES], dtype=np.uint8)
+
+WATER = TILE_IDS['water']
+GRASS = TILE_IDS['grass']
+FOREST = TILE_IDS['forest']
+PATH = TILE_IDS['path']
+CASTLE = TILE_IDS['castle']
+
+def tile_id(tile_type):
+    # Aceita tanto o nome ('water') quanto o ID numérico
+    if isinstance(tile_type, str):
+        return TILE_IDS[tile_type]
+    return int(tile_type)
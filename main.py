@@ -1,33 +1,102 @@
 import pygame
 import sys
+import argparse
 import random
-import math
 import os
+import time
+import numpy as np
 from game.player import Player
 from game.game_state import GameState
 from game.map import GameMap
-from game.npc import NPC
+from game.npc import NPCSystem
 from game.items import ITEMS, ABILITIES
-from game.piranha import Piranha
-from game.objectives import ObjectiveManager
+from game.piranha import PiranhaSwarm
+from game.objectives import ObjectiveManager, completion_message
+from game.hud import Hud, bar, text_lines
+from game.renderer import DirtyRectRenderer
+from game.tiles import TILE_FLAGS, SWIMMABLE, SHELTER
+from game.input import InputState
+from game import clock
+from game.profiler import profiler
+from game.assets import assets
+from game.text import text_cache
+from game.replay import Replay
+from game.spatial import SpatialHash
+
+DEFAULT_WORLD = os.path.join('worlds', 'default')
+
+# Maior tempo de um frame que a simulação tenta recuperar; depois de uma
+# travada longa o jogo fica mais lento em vez de rodar centenas de passos
+MAX_FRAME_MS = 250
+
+# Maior distância do centro do mundo em que algo surge (piranhas)
+SPAWN_RADIUS = 500
 
 class Game:
-    def __init__(self):
-        pygame.init()
-        self.screen = pygame.display.set_mode((800, 600))
-        pygame.display.set_caption("Andre Pereira's Adventure")
+    def __init__(self, headless=False, world_dir=DEFAULT_WORLD, seed=None,
+                 tick_rate=60, max_fps=0, vsync=False, dirty_rects=False, generation_budget_ms=None):
+        # headless=True monta só a simulação, sem janela, imagens ou fontes, para
+        # rodar com Game.step() o mais rápido possível (testes longos, bots)
+        self.headless = headless
+        self.recorder = None  # Replay que grava a entrada de cada passo (ver record_game)
+        self.screen_width = 800
+        self.screen_height = 600
+        # A simulação roda a tick_rate passos por segundo, independente do desenho;
+        # o desenho roda o mais rápido possível, limitado a max_fps (0 = sem
+        # limite) ou ao vsync do monitor
+        self.tick_ms = 1000 / tick_rate
+        self.max_fps = max_fps
+        if headless:
+            self.screen = None
+        else:
+            pygame.init()
+            size = (self.screen_width, self.screen_height)
+            self.screen = None
+            if vsync:
+                try:
+                    self.screen = pygame.display.set_mode(size, pygame.SCALED, vsync=1)
+                except pygame.error:
+                    pass  # Sem suporte a vsync: usa uma janela comum
+            if self.screen is None:
+                self.screen = pygame.display.set_mode(size)
+            pygame.display.set_caption("Andre Pereira's Adventure")
+            # Todas as imagens carregadas uma vez, antes do menu; durante o jogo
+            # os spawns só reutilizam as imagens do cache
+            assets.preload()
         self.clock = pygame.time.Clock()
         
         # Componentes do jogo
-        self.game_state = GameState()
-        self.game_map = GameMap()
+        self.game_state = GameState(headless)
+        # O mundo é salvo em world_dir (None = não salva): chunks já visitados são
+        # lidos do disco. Sem tela, os chunks são gerados na hora, sem threads;
+        # com generation_budget_ms, são gerados aos poucos na thread principal,
+        # até esse tempo por frame desenhado (ver run)
+        self.game_map = GameMap(world_dir=world_dir, seed=seed, headless=headless,
+                                generation_workers=0 if headless else 2,
+                                generation_budget_ms=None if headless else generation_budget_ms)
         self.player = None  # Será criado quando o jogo começar
-        self.piranhas = []
-        self.npcs = []
+        self.piranhas = PiranhaSwarm(self.game_map, headless)  # Todas as piranhas, atualizadas de uma vez
+        self.npcs = NPCSystem(headless)  # Todos os NPCs, atualizados de uma vez
+        self.items = []
+        
+        # Índices espaciais para as consultas de proximidade (colisões, coleta);
+        # as entidades são registradas ao surgir, atualizadas quando se movem e
+        # removidas ao sair do jogo. NPCs e piranhas respondem às consultas pelo
+        # NPCSystem e pelo PiranhaSwarm
+        self.item_grid = SpatialHash()
         
         # Inicializa o gerenciador de objetivos
         self.objective_manager = ObjectiveManager()
         
+        # HUD (vida, mana, nível, objetivo, instruções), redesenhado só quando muda
+        self.hud = None if headless else self.build_hud()
+        # Envio dos frames para o display; dirty_rects=True envia só as áreas que
+        # mudaram (para máquinas sem aceleração, onde o envio é o gargalo)
+        self.renderer = None if headless else DirtyRectRenderer(self.screen, dirty_rects)
+        
+        # Chunks onde os spawns acontecem, carregados antes de tudo e fixos no cache
+        self.game_map.load_area(0, 0, SPAWN_RADIUS)
+        
         # Gera algumas piranhas iniciais
         self.generate_piranhas(5)  # Começa com 5 piranhas
         
@@ -35,231 +104,298 @@ class Game:
         self.generate_npcs(3)  # Começa com 3 NPCs
         
         # Gera alguns itens no mapa
-        self.items = []
         self.generate_items(5)  # Começa com 5 itens espalhados
+        
+        # Contadores do mapa que o profiler registra a cada frame
+        profiler.watch('chunks_generated', lambda: self.game_map.chunks_generated)
+        profiler.watch('chunks_loaded', lambda: self.game_map.chunks_loaded)
+        profiler.watch('tile_lookups', lambda: self.game_map.tile_lookups)
+        profiler.watch('text_renders', lambda: text_cache.misses)
+
+    # Os spawns sorteiam pontos pelo índice de spawn dos chunks já conhecidos
+    # (GameMap.random_water_point/random_land_point): não geram chunks nem
+    # consultam tile por tile. Os chunks em volta do centro são carregados no
+    # início (ver __init__); sem lugar possível, o spawn fica para depois
 
     def generate_piranhas(self, count):
+        # Gera piranhas na água, em um raio de 500 pixels do centro
         for _ in range(count):
-            # Encontra uma posição de água para spawnar a piranha
-            water_found = False
-            attempts = 0
-            while not water_found and attempts < 100:
-                x = random.randint(-500, 500)
-                y = random.randint(-500, 500)
-                if self.game_map.get_tile_at(x, y) == 'water':
-                    self.piranhas.append(Piranha(x, y, self.game_map))
-                    water_found = True
-                attempts += 1
+            point = self.game_map.random_water_point(0, 0, SPAWN_RADIUS)
+            if point is None:
+                return
+            self.piranhas.spawn(*point)
 
     def generate_npcs(self, count):
+        # Gera NPCs em terra (NPCs não spawnam na água), em um raio de 200 pixels do centro
         for _ in range(count):
-            # Gera NPCs em um raio de 200 pixels do centro
-            x = random.randint(-200, 200)
-            y = random.randint(-200, 200)
-            if self.game_map.get_tile_at(x, y) != 'water':  # NPCs não spawnam na água
-                self.npcs.append(NPC(x, y))
+            point = self.game_map.random_land_point(0, 0, 200)
+            if point is None:
+                return
+            self.npcs.spawn(*point)
 
     def generate_items(self, count):
+        # Gera itens em terra, em um raio de 200 pixels do centro
         for _ in range(count):
-            # Gera itens em um raio de 200 pixels do centro
-            x = random.randint(-200, 200)
-            y = random.randint(-200, 200)
-            if self.game_map.get_tile_at(x, y) != 'water':  # Itens não spawnam na água
-                potion = ITEMS['potion']()
-                potion.x = x
-                potion.y = y
-                self.items.append(potion)
+            point = self.game_map.random_land_point(0, 0, 200)
+            if point is None:
+                return
+            potion = ITEMS['potion'](self.headless)
+            potion.x, potion.y = point
+            self.items.append(potion)
+            self.item_grid.insert(potion)
 
     def start_new_game(self):
         # Cria o jogador no centro da tela
-        screen_width = self.screen.get_width()
-        screen_height = self.screen.get_height()
-        self.player = Player(screen_width // 2, screen_height // 2)
+        self.player = Player(self.screen_width // 2, self.screen_height // 2, self.headless)
         self.game_state.current_state = GameState.PLAYING
         
         # Define o objetivo inicial
         self.objective_manager.set_objective("Eliminar NPCs", 2)
 
-    def handle_input(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return False
-                
-            if event.type == pygame.KEYDOWN:
-                if self.game_state.current_state == GameState.MENU:
-                    if event.key == pygame.K_RETURN:
-                        self.start_new_game()
-                        
-                elif self.game_state.current_state == GameState.PLAYING:
-                    if event.key == pygame.K_ESCAPE:
-                        self.game_state.toggle_pause()
-                    elif event.key == pygame.K_i:
-                        self.game_state.toggle_inventory()
-                    elif event.key == pygame.K_SPACE:
-                        if not self.player.is_jumping:
-                            self.player.vertical_velocity = -10
-                            self.player.is_jumping = True
-                    elif event.key == pygame.K_q:  # Usar habilidade
-                        if self.player:
-                            self.player.use_ability(self)
-                    elif event.key in [pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4]:  # Usar item
-                        if self.player:
-                            item_index = event.key - pygame.K_1
-                            self.player.use_item(item_index)
-                            
-                elif self.game_state.current_state == GameState.PAUSED:
-                    if event.key == pygame.K_ESCAPE:
-                        self.game_state.toggle_pause()
+    def step(self, inputs=None, dt=None):
+        # Um passo da simulação: avança o relógio dt milissegundos (padrão: um
+        # passo de tick_rate), aplica a entrada (InputState) e atualiza o jogo.
+        # Não desenha nada. Retorna False se a entrada pediu para fechar o jogo.
+        if inputs is None:
+            inputs = InputState()
+        if dt is None:
+            dt = self.tick_ms
+        if inputs.quit:
+            return False
+        if self.recorder is not None:
+            self.recorder.record(inputs)
+        profiler.count('steps')
+        clock.advance(dt)
+        self.save_positions()
+        with profiler.section('input'):
+            self.handle_input(inputs, dt)
+        self.update(inputs, dt)
+        return True
+
+    def save_positions(self):
+        # Guarda a posição de cada entidade antes do passo; o desenho interpola
+        # entre essa posição e a nova (ver draw)
+        self.npcs.save_positions()
+        self.piranhas.save_positions()
+        if self.player:
+            self.player.prev_x = self.player.x
+            self.player.prev_y = self.player.y
+            for ability in self.player.abilities.values():
+                ability.save_positions()
+
+    def handle_input(self, inputs, dt=clock.FRAME_MS):
+        for key in inputs.pressed:
+            if self.game_state.current_state == GameState.MENU:
+                if key == pygame.K_RETURN:
+                    self.start_new_game()
+                    
+            elif self.game_state.current_state == GameState.PLAYING:
+                if key == pygame.K_ESCAPE:
+                    self.game_state.toggle_pause()
+                elif key == pygame.K_i:
+                    self.game_state.toggle_inventory()
+                elif key == pygame.K_SPACE:
+                    if not self.player.is_jumping:
+                        self.player.vertical_velocity = -10
+                        self.player.is_jumping = True
+                elif key == pygame.K_q:  # Usar habilidade
+                    if self.player:
+                        self.player.use_ability(self)
+                elif key in [pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4]:  # Usar item
+                    if self.player:
+                        item_index = key - pygame.K_1
+                        self.player.use_item(item_index)
                         
-                elif self.game_state.current_state == GameState.INVENTORY:
-                    if event.key == pygame.K_i or event.key == pygame.K_ESCAPE:
-                        self.game_state.toggle_inventory()
+            elif self.game_state.current_state == GameState.PAUSED:
+                if key == pygame.K_ESCAPE:
+                    self.game_state.toggle_pause()
+                    
+            elif self.game_state.current_state == GameState.INVENTORY:
+                if key == pygame.K_i or key == pygame.K_ESCAPE:
+                    self.game_state.toggle_inventory()
         
         # Movimento contínuo
         if self.game_state.current_state == GameState.PLAYING and self.player:
-            keys = pygame.key.get_pressed()
+            keys = inputs
+            speed = self.player.speed * dt / clock.FRAME_MS
             if keys[pygame.K_LEFT]:
-                self.player.x -= self.player.speed
+                self.player.x -= speed
                 self.player.facing_right = False
             if keys[pygame.K_RIGHT]:
-                self.player.x += self.player.speed
+                self.player.x += speed
                 self.player.facing_right = True
             if keys[pygame.K_UP]:
-                self.player.y -= self.player.speed
+                self.player.y -= speed
             if keys[pygame.K_DOWN]:
-                self.player.y += self.player.speed
-                
-        return True
+                self.player.y += speed
         
-    def update(self):
+    def update(self, inputs, dt=clock.FRAME_MS):
         if self.game_state.current_state == GameState.PLAYING:
             # Atualiza o jogador
-            self.player.update()
+            with profiler.section('player'):
+                self.player.update(inputs, dt, self)
             
             # Atualiza as habilidades do jogador
-            for ability in self.player.abilities.values():
-                ability.update(self)
+            with profiler.section('abilities'):
+                for ability in self.player.abilities.values():
+                    ability.update(self, dt)
             
             # Atualiza o mapa baseado na posição do jogador
-            self.game_map.update_chunks(self.player.x, self.player.y)
+            with profiler.section('chunks'):
+                self.game_map.update_chunks(self.player.x, self.player.y, self.player.facing_right)
             
             # Verifica colisões
-            self.check_castle_collision()
-            self.check_water_collision()
+            with profiler.section('collisions'):
+                self.check_castle_collision()
+                self.check_water_collision()
             
             # Atualiza os NPCs e verifica se algum morreu
-            npcs_to_remove = []
-            for npc in self.npcs:
-                npc.update(self.player.x, self.player.y)
-                if npc.is_dead:
-                    npcs_to_remove.append(npc)
+            with profiler.section('npcs'):
+                # Movimento e balão de fala de todos os NPCs num passo só
+                self.npcs.update(dt, self.player.x, self.player.y)
+                
+                # Remove NPCs mortos
+                for _ in range(self.npcs.remove_dead()):
                     self.objective_manager.on_npc_killed()
             
-            # Remove NPCs mortos
-            for npc in npcs_to_remove:
-                if npc in self.npcs:
-                    self.npcs.remove(npc)
-            
             # Atualiza as piranhas
-            self.update_piranhas()
+            with profiler.section('piranhas'):
+                self.update_piranhas(dt)
             
             # Verifica coleta de itens
-            self.check_item_collection()
+            with profiler.section('items'):
+                self.check_item_collection()
             
             # Atualiza a câmera
-            self.camera_x = self.player.x - (self.screen.get_width() // 2)
-            self.camera_y = self.player.y - (self.screen.get_height() // 2)
+            self.camera_x = self.player.x - (self.screen_width // 2)
+            self.camera_y = self.player.y - (self.screen_height // 2)
             
             # Atualiza os objetivos
-            self.objective_manager.update()
+            self.objective_manager.update(dt)
             
-    def draw(self):
-        if self.game_state.current_state == GameState.MENU:
-            self.game_state.draw_menu(self.screen)
+    def interpolation_offset(self, entity, alpha):
+        # Quanto falta para a entidade chegar à posição atual quando desenhada
+        # a uma fração alpha do caminho desde o passo anterior; somado à câmera,
+        # desenha a entidade na posição interpolada sem mudar o seu draw
+        return ((entity.x - entity.prev_x) * (1 - alpha),
+                (entity.y - entity.prev_y) * (1 - alpha))
+        
+    def draw(self, alpha=1.0):
+        # alpha: fração do próximo passo já decorrida (1.0 = posições atuais)
+        state = self.game_state.current_state
+        renderer = self.renderer
+        if state == GameState.MENU:
+            renderer.show_static(state, self.game_state.draw_menu)
+            
+        elif state == GameState.PLAYING:
+            # A câmera segue a posição interpolada do jogador
+            offset_x, offset_y = self.interpolation_offset(self.player, alpha)
+            camera_x = self.camera_x - offset_x
+            camera_y = self.camera_y - offset_y
+            renderer.begin_scene(camera_x, camera_y)
             
-        elif self.game_state.current_state == GameState.PLAYING:
             # Limpa a tela
             self.screen.fill((135, 206, 235))  # Cor do céu
             
             # Desenha o mapa
-            self.game_map.draw(self.screen, self.camera_x, self.camera_y)
-            
-            # Desenha os itens
-            for item in self.items:
-                screen_x = item.x - self.camera_x
-                screen_y = item.y - self.camera_y
-                if (-32 <= screen_x <= self.screen.get_width() + 32 and
-                    -32 <= screen_y <= self.screen.get_height() + 32):
-                    self.screen.blit(item.image, (screen_x - 16, screen_y - 16))
-            
-            # Desenha os NPCs
-            for npc in self.npcs:
-                npc.draw(self.screen, self.camera_x, self.camera_y)
+            with profiler.section('draw_map'):
+                if self.game_map.draw(self.screen, camera_x, camera_y):
+                    renderer.invalidate()
             
-            # Desenha as piranhas
-            for piranha in self.piranhas:
-                piranha.draw(self.screen, self.camera_x, self.camera_y)
-            
-            # Desenha as habilidades
-            for ability in self.player.abilities.values():
-                ability.draw(self.screen, self.camera_x, self.camera_y)
-            
-            # Desenha o jogador
-            self.player.draw(self.screen, self.camera_x, self.camera_y)
-            
-            # Desenha a UI
-            self.draw_ui()
+            with profiler.section('draw_entities'):
+                entity_rects = []  # Áreas desenhadas (para o envio parcial da tela)
+                
+                # Desenha os itens
+                for item in self.items:
+                    screen_x = item.x - camera_x
+                    screen_y = item.y - camera_y
+                    if (-32 <= screen_x <= self.screen.get_width() + 32 and
+                        -32 <= screen_y <= self.screen.get_height() + 32):
+                        entity_rects.append(self.screen.blit(item.image, (screen_x - 16, screen_y - 16)))
+                        profiler.count('blits')
+                
+                # Desenha os NPCs (só os que estão perto da tela)
+                margin = 2 * self.npcs.width
+                for npc in self.npcs.visible(camera_x - margin, camera_y - margin,
+                                             camera_x + self.screen_width + margin,
+                                             camera_y + self.screen_height + margin):
+                    offset_x, offset_y = self.interpolation_offset(npc, alpha)
+                    npc.draw(self.screen, camera_x + offset_x, camera_y + offset_y)
+                    entity_rects.append(npc.screen_rect(camera_x + offset_x, camera_y + offset_y))
+                
+                # Desenha as piranhas (todas de uma vez, só as que estão perto da tela)
+                entity_rects.extend(self.piranhas.draw(self.screen, camera_x, camera_y, alpha))
+                
+                # Desenha as habilidades
+                for ability in self.player.abilities.values():
+                    ability.draw(self.screen, camera_x, camera_y, alpha)
+                    entity_rects.extend(ability.screen_rects(camera_x, camera_y, alpha))
+                
+                # Desenha o jogador
+                offset_x, offset_y = self.interpolation_offset(self.player, alpha)
+                self.player.draw(self.screen, camera_x + offset_x, camera_y + offset_y)
+                entity_rects.append(self.player.screen_rect(camera_x + offset_x, camera_y + offset_y))
+                renderer.track_entities(entity_rects)
             
-            # Desenha os objetivos
-            self.objective_manager.draw(self.screen)
+            with profiler.section('draw_ui'):
+                # Desenha a UI (vida, mana, nível, objetivo, instruções)
+                self.hud.draw(self.screen)
+                renderer.add(self.hud.changed)
             
-        if self.game_state.current_state == GameState.PAUSED:
-            self.game_state.draw_pause(self.screen)
+        elif state == GameState.PAUSED:
+            # O jogo parado fica por baixo da camada de pausa (desenhadas uma vez)
+            renderer.show_static(state, self.game_state.draw_pause)
             
-        if self.game_state.current_state == GameState.INVENTORY:
-            self.game_state.draw_inventory(self.screen)
+        elif state == GameState.INVENTORY:
+            renderer.show_static((state, len(self.game_state.inventory)), self.game_state.draw_inventory)
             
-        pygame.display.flip()
+        # Overlay do profiler (F3)
+        renderer.draw_overlay()
         
-    def draw_ui(self):
-        if not self.player:
-            return
-            
-        # Barra de vida
-        health_width = 200
-        health_height = 20
-        health_x = 10
-        health_y = 40  # Movido para baixo
+        with profiler.section('present'):
+            renderer.present()
         
-        pygame.draw.rect(self.screen, (255, 0, 0), 
-                        (health_x, health_y, health_width, health_height))
-        current_health_width = (self.player.health / self.player.max_health) * health_width
-        pygame.draw.rect(self.screen, (0, 255, 0), 
-                        (health_x, health_y, current_health_width, health_height))
-                        
-        # Barra de mana
-        mana_y = health_y + health_height + 5
-        pygame.draw.rect(self.screen, (0, 0, 100), 
-                        (health_x, mana_y, health_width, health_height))
-        current_mana_width = (self.player.mana / self.player.max_mana) * health_width
-        pygame.draw.rect(self.screen, (0, 0, 255), 
-                        (health_x, mana_y, current_mana_width, health_height))
-                        
-        # Nível e experiência
-        level_text = f"Nível {self.player.level}"
-        exp_text = f"EXP: {self.player.experience}/{self.player.exp_to_next_level}"
-        level_surface = self.player.font.render(level_text, True, (255, 255, 255))
-        exp_surface = self.player.font.render(exp_text, True, (255, 255, 255))
-        self.screen.blit(level_surface, (10, mana_y + health_height + 5))
-        self.screen.blit(exp_surface, (10, mana_y + health_height + 30))
+    def build_hud(self):
+        # Widgets do HUD, cada um ligado ao estado que mostra; só são desenhados
+        # de novo quando esse estado muda (ver game/hud.py)
+        hud = Hud(self.screen_width, self.screen_height)
+        white = (255, 255, 255)
         
-        # Habilidade selecionada
-        if self.player.selected_ability:
-            ability_text = f"Q: {self.player.selected_ability.name}"
-            ability_surface = self.player.font.render(ability_text, True, (255, 255, 255))
-            self.screen.blit(ability_surface, (10, mana_y + health_height + 55))
-            
-        # Instruções das teclas (movidas para o canto superior direito)
+        # Instruções e vida do jogador (canto superior esquerdo)
+        hud.add(lambda: (self.player.health, self.player.max_health),
+                lambda health: text_lines(["Setas: Mover", "ESC: Sair", f"Vida: {health[0]}/{health[1]}"],
+                                          24, white, 30),
+                (10, 10))
+        
+        # Mensagem do castelo
+        hud.add(lambda: self.player.in_castle and self.player.message_timer > 0,
+                lambda visible: text_cache.render("Bem-vindo ao Castelo!", 24, white) if visible else None,
+                lambda surface: (self.screen_width / 2 - surface.get_width() / 2,
+                                 50 - surface.get_height() / 2))
+        
+        # Barras de vida e de mana
+        bar_width = 200
+        bar_height = 20
+        hud.add(lambda: (self.player.health, self.player.max_health),
+                lambda health: bar(bar_width, bar_height, health[0] / health[1], (255, 0, 0), (0, 255, 0)),
+                (10, 40))
+        mana_y = 40 + bar_height + 5
+        hud.add(lambda: (self.player.mana, self.player.max_mana),
+                lambda mana: bar(bar_width, bar_height, mana[0] / mana[1], (0, 0, 100), (0, 0, 255)),
+                (10, mana_y))
+        
+        # Nível, experiência e habilidade selecionada
+        hud.add(lambda: self.player.level,
+                lambda level: text_cache.render(f"Nível {level}", 24, white),
+                (10, mana_y + bar_height + 5))
+        hud.add(lambda: (self.player.experience, self.player.exp_to_next_level),
+                lambda exp: text_cache.render(f"EXP: {exp[0]}/{exp[1]}", 24, white),
+                (10, mana_y + bar_height + 30))
+        hud.add(lambda: self.player.selected_ability and self.player.selected_ability.name,
+                lambda name: text_cache.render(f"Q: {name}", 24, white) if name else None,
+                (10, mana_y + bar_height + 55))
+        
+        # Instruções das teclas (canto superior direito)
         instructions = [
             "Setas: Mover",
             "Espaço: Pular",
@@ -268,9 +404,25 @@ class Game:
             "1-4: Usar Item do Inventário",
             "ESC: Pausar"
         ]
-        for i, text in enumerate(instructions):
-            text_surface = self.player.font.render(text, True, (255, 255, 255))
-            self.screen.blit(text_surface, (self.screen.get_width() - text_surface.get_width() - 10, 10 + i * 25))
+        hud.add(lambda: None,
+                lambda _: text_lines(instructions, 24, white, 25, align='right'),
+                lambda surface: (self.screen_width - surface.get_width() - 10, 10))
+        
+        # Objetivo atual (abaixo das barras) e mensagem de conclusão (centro da tela)
+        def objective():
+            objective = self.objective_manager.current_objective
+            if objective:
+                return (objective.description, objective.current_count, objective.target_count)
+        hud.add(objective,
+                lambda value: text_cache.render(f"Objetivo: {value[0]} ({value[1]}/{value[2]})",
+                                                32, white) if value else None,
+                (10, 100))
+        hud.add(lambda: bool(self.objective_manager.current_objective and
+                             self.objective_manager.current_objective.show_completion_message),
+                lambda visible: completion_message() if visible else None,
+                lambda surface: (self.screen_width // 2 - surface.get_width() // 2,
+                                 self.screen_height // 2 - surface.get_height() // 2))
+        return hud
         
     def check_castle_collision(self):
         # Verifica vários pontos ao redor do jogador para melhor detecção
@@ -282,11 +434,8 @@ class Game:
             (self.player.x + self.player.width/4, self.player.y + self.player.height/4)   # Inferior direito
         ]
         
-        castle_count = 0
-        for x, y in points_to_check:
-            tile_type = self.game_map.get_tile_at(x, y)
-            if tile_type == 'castle':
-                castle_count += 1
+        xs, ys = zip(*points_to_check)
+        castle_count = np.count_nonzero(TILE_FLAGS[self.game_map.get_tiles_at(xs, ys)] & SHELTER)
         
         # Só considera dentro do castelo se a maioria dos pontos estiver em tiles do tipo castle
         if castle_count >= 3:
@@ -304,13 +453,9 @@ class Game:
             (self.player.x + self.player.width/3, self.player.y + self.player.height/3)   # Inferior direito
         ]
         
-        water_tiles = 0
         total_tiles = len(points_to_check)
-        
-        for x, y in points_to_check:
-            tile_type = self.game_map.get_tile_at(x, y)
-            if tile_type == 'water':
-                water_tiles += 1
+        xs, ys = zip(*points_to_check)
+        water_tiles = np.count_nonzero(TILE_FLAGS[self.game_map.get_tiles_at(xs, ys)] & SWIMMABLE)
         
         # Só considera na água se mais de 50% dos pontos estiverem em água
         if water_tiles > total_tiles / 2:
@@ -326,64 +471,150 @@ class Game:
                           obj2.width, obj2.height)
         return rect1.colliderect(rect2)
 
-    def update_piranhas(self):
-        for piranha in self.piranhas:
-            piranha.update()
+    def update_piranhas(self, dt=clock.FRAME_MS):
+        # Move todas as piranhas (e remove as que saíram da água)
+        self.piranhas.update(dt)
             
-            # Verifica colisão com o jogador
-            if self.player and self.player.in_water:
-                dx = piranha.x - self.player.x
-                dy = piranha.y - self.player.y
-                distance = math.sqrt(dx * dx + dy * dy)
-                
-                if distance < 30:  # Distância para causar dano
-                    self.player.take_damage()
-                    
-        # Remove piranhas que saíram da água
-        self.piranhas = [p for p in self.piranhas if self.game_map.get_tile_at(p.x, p.y) == 'water']
+        # Verifica colisão com o jogador (distância para causar dano: 30)
+        if self.player and self.player.in_water:
+            for _ in range(self.piranhas.count_near(self.player.x, self.player.y, 30)):
+                self.player.take_damage()
         
         # Mantém um número mínimo de piranhas
         if len(self.piranhas) < 5:
             self.generate_piranhas(1)
 
     def check_item_collection(self):
-        # Lista para armazenar itens que devem ser removidos
-        items_to_remove = []
+        # Coleta os itens perto o suficiente do jogador (raio de coleta de 40 pixels)
+        items_to_remove = self.item_grid.query_radius(self.player.x, self.player.y, 40)
         
-        for item in self.items:
-            # Calcula a distância entre o jogador e o item
-            dx = self.player.x - item.x
-            dy = self.player.y - item.y
-            distance = math.sqrt(dx * dx + dy * dy)
+        for item in items_to_remove:
+            # Adiciona o item ao inventário do game_state
+            self.game_state.inventory.append(item)
+            self.item_grid.remove(item)
             
-            # Se o jogador está próximo o suficiente, coleta o item
-            if distance < 40:  # Raio de coleta de 40 pixels
-                # Adiciona o item ao inventário do game_state
-                self.game_state.inventory.append(item)
-                items_to_remove.append(item)
-                
-                # Efeito sonoro ou visual de coleta (opcional)
-                # TODO: Adicionar efeito sonoro
+            # Efeito sonoro ou visual de coleta (opcional)
+            # TODO: Adicionar efeito sonoro
         
         # Remove os itens coletados da lista de itens no mapa
-        for item in items_to_remove:
-            self.items.remove(item)
+        if items_to_remove:
+            self.items = [item for item in self.items if item not in self.item_grid]
             
         # Gera novos itens se necessário
         if len(self.items) < 5:
             self.generate_items(1)
 
     def run(self):
+        # Passo fixo: o tempo real de cada frame entra num acumulador e a
+        # simulação roda quantos passos de tick_ms couberem nele; o resto vira
+        # a fração usada para interpolar o desenho. Se o desenho ficar lento,
+        # só a taxa de frames cai; a simulação continua com o mesmo passo.
         running = True
+        accumulator = 0.0
+        previous = time.perf_counter()
+        pressed = []  # Teclas apertadas que ainda não foram para um passo
         while running:
-            running = self.handle_input()
-            self.update()
-            self.draw()
-            self.clock.tick(60)
+            profiler.begin_frame()
+            now = time.perf_counter()
+            accumulator += min((now - previous) * 1000, MAX_FRAME_MS)
+            previous = now
+            
+            with profiler.section('input'):
+                inputs = InputState.from_pygame()
+            if pygame.K_F3 in inputs.pressed:
+                profiler.toggle_overlay()
+            pressed.extend(inputs.pressed)
+            running = not inputs.quit
+            while running and accumulator >= self.tick_ms:
+                running = self.step(InputState(inputs.held, pressed), self.tick_ms)
+                pressed = []
+                accumulator -= self.tick_ms
+                
+            # Geração de chunks por orçamento: uma vez por frame, por mais passos
+            # que a simulação tenha dado
+            if self.game_map.poll_per_frame:
+                with profiler.section('chunk_generation'):
+                    self.game_map.install_ready_chunks()
+            self.draw(accumulator / self.tick_ms)
+            profiler.end_frame()
+            self.clock.tick(self.max_fps)
         
+        # Tempos de cada frame da sessão, para comparar entre versões
+        profiler.export(os.path.join('profiles', 'last_session'))
+        self.game_map.shutdown()
         pygame.quit()
         sys.exit()
 
+def record_game(path, **options):
+    # Joga normalmente gravando a entrada de cada passo em path. O random e o
+    # relógio são iniciados com valores conhecidos antes de criar o Game, para
+    # que a sessão possa ser repetida exatamente (ver play_replay)
+    spawn_seed = random.randrange(2 ** 32)
+    world_seed = random.randint(0, 1000000)
+    random.seed(spawn_seed)
+    clock.reset()
+    game = Game(seed=world_seed, **options)
+    # Um mundo salvo em disco mantém o seed com que foi criado
+    game.recorder = Replay(game.game_map.world_seed, spawn_seed, game.tick_ms)
+    try:
+        game.run()
+    finally:
+        game.recorder.save(path)
+        print(f"Replay gravado em {path}: {len(game.recorder.steps)} passos")
+
+def play_replay(path):
+    # Repete uma sessão gravada sem tela e sem esperar o tempo real; retorna
+    # o tempo total e os percentis do tempo de cada passo da simulação
+    replay = Replay.load(path)
+    random.seed(replay.spawn_seed)
+    clock.reset()
+    game = Game(headless=True, world_dir=None, seed=replay.world_seed,
+                tick_rate=1000 / replay.tick_ms)
+    step_times = []
+    start = time.perf_counter()
+    for inputs in replay.inputs():
+        step_start = time.perf_counter()
+        game.step(inputs, replay.tick_ms)
+        step_times.append((time.perf_counter() - step_start) * 1000)
+    total = time.perf_counter() - start
+    game.game_map.shutdown()
+    
+    step_times.sort()
+    last = len(step_times) - 1
+    percentile = lambda p: step_times[round(last * p)] if step_times else 0.0
+    player = game.player
+    return {
+        'steps': len(step_times),
+        'sim_seconds': len(step_times) * replay.tick_ms / 1000,
+        'wall_seconds': total,
+        'steps_per_second': len(step_times) / total if total else 0.0,
+        'step_ms': {'p50': percentile(0.5), 'p95': percentile(0.95),
+                    'p99': percentile(0.99), 'max': percentile(1.0)},
+        # Estado final, para conferir que a repetição deu o mesmo resultado
+        'final_state': {'x': player.x, 'y': player.y, 'health': player.health,
+                        'mana': player.mana, 'npcs': len(game.npcs)} if player else None,
+    }
+
 if __name__ == "__main__":
-    game = Game()
-    game.run() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Andre Pereira's Adventure")
+    parser.add_argument('--record', metavar='ARQUIVO', help="Grava a sessão num arquivo de replay")
+    parser.add_argument('--replay', metavar='ARQUIVO',
+                        help="Repete um replay sem tela, o mais rápido possível, e mostra os tempos")
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help="Envia ao display só as áreas da tela que mudaram (sem aceleração de vídeo)")
+    parser.add_argument('--generation-budget', metavar='MS', type=float,
+                        help="Gera os chunks na thread principal, até MS milissegundos por frame (sem threads)")
+    args = parser.parse_args()
+    
+    if args.replay:
+        result = play_replay(args.replay)
+        print(f"{result['steps']} passos ({result['sim_seconds']:.1f}s de jogo) "
+              f"em {result['wall_seconds']:.2f}s: {result['steps_per_second']:.0f} passos/s")
+        print("Tempo por passo (ms): " + "  ".join(f"{name} {value:.3f}"
+                                                  for name, value in result['step_ms'].items()))
+        print(f"Estado final: {result['final_state']}")
+    elif args.record:
+        record_game(args.record, dirty_rects=args.dirty_rects, generation_budget_ms=args.generation_budget)
+    else:
+        game = Game(dirty_rects=args.dirty_rects, generation_budget_ms=args.generation_budget)
+        game.run() 
\ No newline at end of file
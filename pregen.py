@@ -0,0 +1,112 @@
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from opensimplex import OpenSimplex
+from game.chunk import Chunk
+from game.region_store import RegionStore
+
+# Gera uma área retangular do mundo antes de jogar e grava no disco, para que
+# o terreno perto do início já esteja pronto. Não usa o pygame nem a tela.
+#
+#   python pregen.py --world worlds/default --seed 1234 --radius 8
+#   python pregen.py --world worlds/default --area -20 -20 20 20 --workers 4
+
+# Mesmos valores do GameMap
+TILE_SIZE = 64
+CHUNK_SIZE = 12
+
+noise_gen = None  # Gerador de ruído de cada processo (criado em init_worker)
+
+
+def init_worker(seed):
+    global noise_gen
+    noise_gen = OpenSimplex(seed=seed)
+
+
+def generate_chunks(chunks):
+    # Gera uma lista de chunks; roda num processo do pool
+    start = time.perf_counter()
+    results = []
+    for chunk_x, chunk_y in chunks:
+        chunk = Chunk(chunk_x, chunk_y, TILE_SIZE, CHUNK_SIZE, CHUNK_SIZE, noise_gen)
+        results.append((chunk_x, chunk_y, chunk.tile_ids))
+    return os.getpid(), time.perf_counter() - start, results
+
+
+def split_tasks(store, min_x, min_y, max_x, max_y, force):
+    # Divide a área em tarefas de uma linha de chunks dentro de uma região,
+    # pulando chunks já salvos; pequenas o bastante para ocupar todos os processos
+    tasks = {}
+    for chunk_y in range(min_y, max_y + 1):
+        for chunk_x in range(min_x, max_x + 1):
+            if not force and store.contains(chunk_x, chunk_y):
+                continue
+            region_x, region_y, _ = store.locate(chunk_x, chunk_y)
+            tasks.setdefault((region_x, region_y, chunk_y), []).append((chunk_x, chunk_y))
+    return list(tasks.values())
+
+
+def pregenerate(world_dir, seed, min_x, min_y, max_x, max_y, workers, force=False):
+    store = RegionStore(world_dir, seed, CHUNK_SIZE)
+    tasks = split_tasks(store, min_x, min_y, max_x, max_y, force)
+    total = sum(len(chunks) for chunks in tasks)
+    print(f"Mundo {world_dir} (seed {store.seed}): {total} chunks a gerar "
+          f"em {len(tasks)} tarefas com {workers} processos")
+
+    worker_stats = {}  # pid -> [chunks, segundos gerando]
+    done = 0
+    start = time.perf_counter()
+    # Os processos só geram; só este processo grava no disco
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=(store.seed,)) as pool:
+        for pid, elapsed, results in pool.imap_unordered(generate_chunks, tasks):
+            for chunk_x, chunk_y, tiles in results:
+                store.save(chunk_x, chunk_y, tiles)
+            stats = worker_stats.setdefault(pid, [0, 0.0])
+            stats[0] += len(results)
+            stats[1] += elapsed
+            done += len(results)
+            print(f"  {done}/{total} chunks", end='\r', flush=True)
+    store.close()
+    elapsed = time.perf_counter() - start
+
+    tiles_per_chunk = CHUNK_SIZE * CHUNK_SIZE
+    print()
+    for number, (pid, (chunks, seconds)) in enumerate(sorted(worker_stats.items()), 1):
+        rate = chunks / seconds if seconds else 0.0
+        print(f"  processo {number} (pid {pid}): {chunks} chunks, "
+              f"{rate:.1f} chunks/s, {rate * tiles_per_chunk:.0f} tiles/s")
+    rate = total / elapsed if elapsed else 0.0
+    print(f"Total: {total} chunks em {elapsed:.2f}s, "
+          f"{rate:.1f} chunks/s, {rate * tiles_per_chunk:.0f} tiles/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera antecipadamente uma área do mundo")
+    parser.add_argument('--world', default=os.path.join('worlds', 'default'),
+                        help="Pasta do mundo (a mesma usada pelo jogo)")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="Seed de um mundo novo (um mundo existente mantém o seu)")
+    parser.add_argument('--radius', type=int, default=8,
+                        help="Gera os chunks a até N chunks do início (0, 0)")
+    parser.add_argument('--area', type=int, nargs=4, metavar=('X0', 'Y0', 'X1', 'Y1'),
+                        help="Retângulo de chunks a gerar (inclusivo); substitui --radius")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Número de processos (padrão: todos os núcleos)")
+    parser.add_argument('--force', action='store_true',
+                        help="Regera também os chunks já salvos")
+    args = parser.parse_args()
+
+    if args.area:
+        min_x, min_y, max_x, max_y = args.area
+    else:
+        min_x = min_y = -args.radius
+        max_x = max_y = args.radius
+    seed = args.seed if args.seed is not None else random.randint(0, 1000000)
+    pregenerate(args.world, seed, min(min_x, max_x), min(min_y, max_y),
+                max(min_x, max_x), max(min_y, max_y), max(1, args.workers), args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import math
+import os
+import random
+
+# Os testes de desenho usam uma tela sem janela
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+import pytest
+import main
+from game import clock
+from game.input import InputState
+
+SEED = 1234
+
+
+@pytest.fixture
+def game():
+    random.seed(SEED)
+    clock.reset()
+    game = main.Game(world_dir=None, seed=SEED)
+    game.start_new_game()
+    game.step()
+    game.draw()
+    yield game
+    game.game_map.shutdown()
+
+
+def assert_view_on_camera(game):
+    # A imagem do mapa cobre a tela com a margem em volta da câmera atual
+    view = game.game_map.view_rect
+    margin = game.game_map.view_margin
+    assert 0 <= game.camera_x - view.x < 2 * margin
+    assert 0 <= game.camera_y - view.y < 2 * margin
+
+
+def test_walking_scrolls_map_view(game):
+    rebuilds = game.game_map.view_rebuilds
+    for _ in range(60):
+        game.step(InputState(held=[pygame.K_RIGHT]))
+        game.draw()
+    assert game.game_map.view_rebuilds == rebuilds
+    assert_view_on_camera(game)
+
+
+def test_teleport_rebuilds_map_view(game):
+    # Teleporte pelo atalho (E), o mesmo caminho da entrada do jogo
+    rebuilds = game.game_map.view_rebuilds
+    start_x = game.player.x
+    game.step(InputState(held=[pygame.K_e]))
+    assert abs(game.player.x - start_x) == 100
+    game.draw(0.0)  # Início do passo: o salto não é interpolado
+    assert game.game_map.view_rebuilds == rebuilds + 1
+    assert game.game_map.view_rect.x == math.floor(game.camera_x) - game.game_map.view_margin
+    assert_view_on_camera(game)